@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import argparse
+import logging
+import random
+import timeit
+
+import sdm_modbus
+from sdm_modbus import meter
+
+
+MODELS = [
+    sdm_modbus.SDM72V2,
+    sdm_modbus.SDM72,
+    sdm_modbus.SDM120,
+    sdm_modbus.SDM230,
+    sdm_modbus.SDM630,
+    sdm_modbus.GNM3D,
+    sdm_modbus.EM24,
+    sdm_modbus.TAC4300_CT,
+    sdm_modbus.ESPP1
+]
+
+
+def decode_legacy(device, plan, registers):
+    # Decoding as done before decode plans: one convert_from_registers call per key
+    results = {}
+
+    for k, v in plan.values.items():
+        address, length, rtype, dtype, vtype, label, fmt, batch, sf = v
+        value = device.client.convert_from_registers(
+            registers[address - plan.offset:address - plan.offset + length],
+            device._convert_data_type(dtype),
+            device._endian_enum_to_string(device.wordorder)
+        )
+
+        if not isinstance(value, list):
+            results[k] = vtype(value)
+
+    return results
+
+
+def decode_plan(device, plan, registers):
+    return plan.decode(registers)
+
+
+def poll(decoder, device, blocks):
+    for plan, registers in blocks:
+        decoder(device, plan, registers)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--number", type=int, default=2000, help="Polls per measurement")
+    argparser.add_argument("--repeat", type=int, default=5, help="Measurements per model")
+    args = argparser.parse_args()
+
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+
+    print(f"{'model':<12} {'keys':>5} {'legacy':>12} {'plan':>12} {'speedup':>8}")
+
+    for model in MODELS:
+        # Nothing listens on port 1, the instance is only used for its register map
+        device = model(host="127.0.0.1", port=1, timeout=0.1)
+        blocks = []
+
+        for rtype in meter.registerType:
+            for plan in device.plan(rtype):
+                blocks.append((plan, [random.randrange(0x4000) for i in range(plan.length)]))
+
+        keys = sum(len(plan.keys) for plan, registers in blocks)
+        legacy = min(timeit.repeat(lambda: poll(decode_legacy, device, blocks), number=args.number, repeat=args.repeat)) / args.number
+        planned = min(timeit.repeat(lambda: poll(decode_plan, device, blocks), number=args.number, repeat=args.repeat)) / args.number
+
+        print(f"{device.model:<12} {keys:>5} {legacy * 1e6:>10.1f}us {planned * 1e6:>10.1f}us {legacy / planned:>7.1f}x")
+
+        device.disconnect()
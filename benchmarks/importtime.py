@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+STATEMENTS = {
+    "package": "import sdm_modbus",
+    "model": "import sdm_modbus; sdm_modbus.SDM630",
+    "meter": "import sdm_modbus; sdm_modbus.SDM630(host='127.0.0.1', port=1, timeout=0.1).disconnect()",
+    "fleet": "import sdm_modbus; sdm_modbus.MeterFleet",
+    "all": "from sdm_modbus import *"
+}
+
+HEAVY = ["pymodbus", "pymodbus.client", "serial", "numpy", "concurrent.futures"]
+
+
+def measure(statement):
+    # Every measurement runs in a fresh interpreter, nothing is cached in sys.modules
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, *[m for m in {HEAVY!r} if m in sys.modules])\n"
+    )
+
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, text=True).stdout.split()
+    return float(output[0]), output[1:]
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--repeat", type=int, default=10, help="Interpreters started per statement")
+    argparser.add_argument("--max", type=float, default=0, help="Fail if importing the package takes longer (ms)")
+    args = argparser.parse_args()
+
+    print(f"{'statement':<10} {'min':>10} {'median':>10}  loaded")
+
+    for name, statement in STATEMENTS.items():
+        timings = []
+
+        for i in range(args.repeat):
+            elapsed, loaded = measure(statement)
+            timings.append(elapsed)
+
+        print(f"{name:<10} {min(timings) * 1e3:>8.1f}ms {statistics.median(timings) * 1e3:>8.1f}ms  {', '.join(loaded) or '-'}")
+
+        if name == "package" and args.max and min(timings) * 1e3 > args.max:
+            print(f"importing the package took {min(timings) * 1e3:.1f}ms, over the {args.max}ms limit")
+            sys.exit(1)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import time
+import timeit
+import tracemalloc
+
+import pymodbus
+
+import sdm_modbus
+from sdm_modbus import meter
+
+
+MODELS = [
+    sdm_modbus.SDM72V2,
+    sdm_modbus.SDM72,
+    sdm_modbus.SDM120,
+    sdm_modbus.SDM230,
+    sdm_modbus.SDM630,
+    sdm_modbus.GNM3D,
+    sdm_modbus.EM24,
+    sdm_modbus.TAC4300_CT,
+    sdm_modbus.ESPP1
+]
+
+FLEETS = [1, 10, 100, 1000]
+
+# Unit IDs served per simulated gateway, larger fleets get more gateways
+UNITS = 200
+
+
+def rtypes(model):
+    return [rtype for rtype in meter.registerType if any(v.rtype == rtype for v in model.registers.values())]
+
+
+def bench_model(model, simulator, port, repeat):
+    device = model(host="127.0.0.1", port=port, unit=1)
+    result = {}
+
+    for rtype in rtypes(model):
+        device.read_all(rtype)
+
+        requests = simulator.requests
+        device.read_all(rtype)
+        requests = simulator.requests - requests
+
+        timings = timeit.repeat(lambda: device.read_all(rtype), number=1, repeat=repeat)
+
+        blocks = [(plan, registers) for plan, registers in zip(*device._read_blocks(rtype)) if registers]
+        values = sum(len(plan.keys) for plan, registers in blocks)
+        number = max(1, repeat * 10)
+        decode = min(timeit.repeat(lambda: [plan.decode(registers) for plan, registers in blocks], number=number, repeat=5)) / number
+
+        result[rtype.name.lower()] = {
+            "values": values,
+            "requests_per_poll": requests,
+            "read_all_median_ms": statistics.median(timings) * 1e3,
+            "read_all_min_ms": min(timings) * 1e3,
+            "decode_per_value_us": decode / values * 1e6 if values else 0
+        }
+
+    device.disconnect()
+    return result
+
+
+def bench_memory(model, port, count=100):
+    # Meters sharing a connection, as in a fleet, so the client isn't counted
+    parent = model(host="127.0.0.1", port=port, unit=1)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    devices = [model(parent=parent, unit=1) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    for device in devices:
+        device.disconnect()
+
+    parent.disconnect()
+    return size / count
+
+
+def bench_fleet(size, port, polls, latency=0, pipeline=0):
+    config = []
+    simulators = []
+
+    for i in range(0, size, UNITS):
+        units = range(1, min(UNITS, size - i) + 1)
+        simulators.append(sdm_modbus.Simulator({unit: sdm_modbus.SDM630 for unit in units}, latency=latency).start(tcp=port + len(simulators)))
+        config += [{"model": "SDM630", "host": "127.0.0.1", "port": port + len(simulators) - 1, "unit": unit} for unit in units]
+
+        # Meters on a gateway share the pipeline of its first meter
+        if pipeline:
+            config[-len(units)]["pipeline"] = pipeline
+
+    try:
+        with sdm_modbus.MeterFleet.from_config(config, workers=len(simulators)) as fleet:
+            fleet.poll()
+            timings = []
+            values = 0
+
+            for i in range(polls):
+                start = time.perf_counter()
+                results = fleet.poll()
+                timings.append(time.perf_counter() - start)
+                values += sum(len(r.values) for r in results.values() if r.ok)
+
+        elapsed = sum(timings)
+
+        return {
+            "meters": size,
+            "gateways": len(simulators),
+            "poll_median_ms": statistics.median(timings) * 1e3,
+            "meters_per_second": size * polls / elapsed,
+            "values_per_second": values / elapsed
+        }
+    finally:
+        for simulator in simulators:
+            simulator.stop()
+
+
+def compare(results, baseline):
+    # Relative change of every number, positive is more
+    def walk(new, old, path):
+        for k, v in new.items():
+            if isinstance(v, dict) and isinstance(old.get(k), dict):
+                walk(v, old[k], path + [k])
+            elif k != "timestamp" and isinstance(v, (int, float)) and isinstance(old.get(k), (int, float)) and old[k]:
+                print(f"{'.'.join(path + [k]):<60} {old[k]:>12.3f} {v:>12.3f} {(v - old[k]) / old[k] * 100:>+8.1f}%")
+
+    walk(results, baseline, [])
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--port", type=int, default=5020, help="First port for simulated gateways")
+    argparser.add_argument("--repeat", type=int, default=50, help="Polls per model measurement")
+    argparser.add_argument("--polls", type=int, default=5, help="Polls per fleet measurement")
+    argparser.add_argument("--fleets", type=str, default=",".join(str(f) for f in FLEETS), help="Fleet sizes")
+    argparser.add_argument("--latency", type=float, default=0, help="Simulated gateway latency per request in fleet measurements (s)")
+    argparser.add_argument("--pipeline", type=int, default=0, help="Requests in flight per gateway in fleet measurements")
+    argparser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    argparser.add_argument("--compare", type=str, default=None, help="Compare with earlier JSON results")
+    args = argparser.parse_args()
+
+    logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
+
+    results = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "pymodbus": pymodbus.__version__,
+        "models": {},
+        "memory_per_meter_bytes": {},
+        "fleets": {}
+    }
+
+    simulator = sdm_modbus.Simulator().start(tcp=args.port)
+
+    try:
+        for model in MODELS:
+            simulator.meters.clear()
+            simulator.add(1, model)
+
+            results["models"][model.__name__] = bench_model(model, simulator, args.port, args.repeat)
+            results["memory_per_meter_bytes"][model.__name__] = bench_memory(model, args.port)
+
+            for rtype, r in results["models"][model.__name__].items():
+                print(f"{model.__name__:<12} {rtype:<8} {r['values']:>4} values {r['requests_per_poll']:>3} requests {r['read_all_median_ms']:>8.3f}ms/poll {r['decode_per_value_us']:>6.3f}us/value")
+    finally:
+        simulator.stop()
+
+    for size in [int(f) for f in args.fleets.split(",")]:
+        r = bench_fleet(size, args.port + 1, args.polls, args.latency, args.pipeline)
+        results["fleets"][str(size)] = r
+
+        print(f"fleet {size:>5} meters {r['gateways']:>2} gateways {r['poll_median_ms']:>10.1f}ms/poll {r['meters_per_second']:>8.0f} meters/s {r['values_per_second']:>10.0f} values/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
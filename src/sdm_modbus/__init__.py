@@ -1,6 +1,69 @@
-from sdm_modbus.meter import *
-from sdm_modbus.sdm import *
-from sdm_modbus.garo import *
-from sdm_modbus.espp1 import *
-from sdm_modbus.taiyedq import *
-from sdm_modbus.carlogavazzi import *
\ No newline at end of file
+import importlib
+
+
+# Modules are only imported when one of their names is first used, so
+# importing the package doesn't pay for pymodbus, numpy or unused models.
+_modules = {
+    "meter": [
+        "connectionType", "registerType", "registerDataType",
+        "RETRIES", "TIMEOUT", "UNIT", "MAX_REGISTERS", "MAX_WRITE_REGISTERS", "MAX_GAP", "PLAN_CACHE", "STRUCT_FORMATS",
+        "Register", "register_map", "plan_reads", "plan_writes", "DecodePlan", "Meter", "AsyncMeter"
+    ],
+    "pool": ["MAX_CONNECTIONS", "IDLE_TIMEOUT", "BusLock", "PooledConnection", "ConnectionPool", "DEFAULT_POOL"],
+    "retry": [
+        "BACKOFF", "BACKOFF_FACTOR", "BACKOFF_MAX", "JITTER", "BREAKER_THRESHOLD", "BREAKER_CYCLES",
+        "errorType", "exceptionCode", "RetryPolicy", "CircuitBreaker"
+    ],
+    "sdm": [
+        "SDM", "SDM72V2", "SDM72", "SDM120", "SDM230", "SDM630",
+        "AsyncSDM72V2", "AsyncSDM72", "AsyncSDM120", "AsyncSDM230", "AsyncSDM630"
+    ],
+    "garo": ["GARO", "GNM3D", "AsyncGNM3D"],
+    "espp1": ["ESPP1", "AsyncESPP1"],
+    "taiyedq": ["TAC4300_CT", "AsyncTAC4300_CT"],
+    "carlogavazzi": ["CARLOGAVAZZI", "EM24", "AsyncEM24"],
+    "bus": ["frame_silence", "BusEntry", "BusSnapshot", "Bus"],
+    "cache": ["TTL", "RegisterCache"],
+    "delta": ["REFRESH", "DeltaFilter"],
+    "energy": ["SAVE_INTERVAL", "COUNTERS", "POWER", "resolution", "CounterState", "EnergyAccumulator"],
+    "snapshot": ["Snapshot"],
+    "store": ["SEGMENT_ROWS", "meter_name", "series_schema", "Series", "Segment", "TimeSeriesStore"],
+    "pipeline": ["WINDOW", "Pipeline"],
+    "metrics": ["BUCKETS", "FRAMING", "RequestEvent", "Histogram", "RequestStats", "Metrics"],
+    "sampler": ["WINDOWS", "SAMPLES", "SLOTS", "IDLE", "SampleRing", "RollingWindow", "Sampler"],
+    "collector": ["PROCESSES", "CAPACITY", "RingBuffer", "RecordLayout", "CollectorResult", "Collector"],
+    "simulator": ["UPDATE_INTERVAL", "SimulatedMeter", "Simulator"],
+    "columnar": ["NUMPY_FORMATS", "ColumnarPlan", "columnar_plans", "decode_columns", "read_columns"],
+    "fleet": ["WORKERS", "FleetResult", "MeterFleet"],
+    "registry": ["DETECT_CACHE", "MODELS", "DetectCache", "probe", "detect"]
+}
+
+_exports = {name: module for module, names in _modules.items() for name in names}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name in _modules:
+        return importlib.import_module(f"{__name__}.{name}")
+
+    if name in _exports:
+        value = getattr(importlib.import_module(f"{__name__}.{_exports[name]}"), name)
+    else:
+        # Names the modules import themselves (Endian, ...) used to be
+        # re-exported by star imports, keep resolving them.
+        for module in _modules:
+            module = importlib.import_module(f"{__name__}.{module}")
+
+            if hasattr(module, name) and not name.startswith("_"):
+                value = getattr(module, name)
+                break
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_modules) | set(_exports))
@@ -0,0 +1,186 @@
+import threading
+import time
+
+from sdm_modbus import meter
+
+
+def frame_silence(baud):
+    # Modbus RTU requires 3.5 character times (11 bits each) between frames,
+    # fixed at 1.75ms above 19200 baud.
+    if baud > 19200:
+        return 0.00175
+
+    return 3.5 * 11 / baud
+
+
+class BusEntry:
+
+    def __init__(self, device, priority=0, interval=0, rtype=meter.registerType.INPUT, scaling=False, keys=None):
+        self.device = device
+        self.priority = priority
+        self.interval = interval
+        self.rtype = rtype
+        self.scaling = scaling
+        self.keys = keys
+        self.due = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.device!r}, priority={self.priority}, interval={self.interval})"
+
+
+class BusSnapshot:
+
+    def __init__(self, values, timestamps, rest=None):
+        # values and timestamps of the synchronized keys per meter, rest the
+        # values of the slower keys read afterwards
+        self.values = values
+        self.timestamps = timestamps
+        self.rest = rest or {}
+
+        if timestamps:
+            self.timestamp = (min(timestamps.values()) + max(timestamps.values())) / 2
+            self.skew = max(timestamps.values()) - min(timestamps.values())
+        else:
+            self.timestamp = None
+            self.skew = None
+
+    def __repr__(self):
+        skew = f"{self.skew * 1e3:.1f}ms" if self.skew is not None else None
+        return f"{self.__class__.__name__}(meters={len(self.values)}, skew={skew})"
+
+    def all(self):
+        return {device: {**self.rest.get(device, {}), **values} for device, values in self.values.items()}
+
+
+class Bus:
+
+    def __init__(self, parent=None, silence=None, **kwargs):
+        if parent is None:
+            parent = meter.Meter(**kwargs)
+
+        if silence is None:
+            if parent.mode is meter.connectionType.RTU:
+                silence = frame_silence(parent.baud)
+            else:
+                silence = 0
+
+        # Every meter on the connection already shares its lock, which
+        # enforces the silence from now on
+        self.parent = parent
+        self.lock = parent.lock
+        self.lock.silence = silence
+        self.entries = []
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.parent!r}, meters={len(self.entries)}, silence={self.lock.silence})"
+
+    def add(self, device, unit=None, priority=0, interval=0, rtype=meter.registerType.INPUT, scaling=False, keys=None):
+        if isinstance(device, type):
+            device = device(parent=self.parent, unit=unit)
+        elif device.client is not self.parent.client:
+            raise ValueError(f"{device} does not share the bus connection")
+
+        device.lock = self.lock
+        self.entries.append(BusEntry(device, priority, interval, rtype, scaling, keys))
+
+        return device
+
+    def remove(self, device):
+        self.entries = [e for e in self.entries if e.device is not device]
+
+    def meters(self):
+        return [e.device for e in self.entries]
+
+    def next_due(self):
+        if not self.entries:
+            return None
+
+        return min(e.due for e in self.entries)
+
+    def poll(self, limit=None):
+        now = time.monotonic()
+
+        # Highest priority first, entries of equal priority in round-robin order
+        due = sorted((e for e in self.entries if e.due <= now), key=lambda e: -e.priority)
+
+        if limit is not None:
+            due = due[:limit]
+
+        results = {}
+
+        for e in due:
+            results[e.device] = e.device.read_all(e.rtype, e.scaling, e.keys)
+
+            e.due += e.interval
+
+            if e.due <= now:
+                e.due = now + e.interval
+
+            self.entries.remove(e)
+            self.entries.append(e)
+
+        return results
+
+    def snapshot(self, keys, rtype=meter.registerType.INPUT, scaling=False, rest=False):
+        # Reads keys of every meter back to back, so the readings are as
+        # close in time as the bus allows, bypassing any cache. Each meter is
+        # timestamped at the middle of its requests. With rest the meters'
+        # other registers are read afterwards, or rest can list the slower
+        # keys to read.
+        devices = self.meters()
+        plans = {}
+
+        for device in devices:
+            plans[device] = [k for k in keys if k in device.registers and device.registers[k].rtype == rtype]
+
+            # Compile the plans and connect before the first request
+            device.plan(rtype, plans[device])
+
+            if not device.connected():
+                device.connect()
+
+        values = {}
+        timestamps = {}
+
+        # Holding the bus keeps other pollers out of the synchronized pass
+        with self.lock:
+            for device in devices:
+                if not plans[device]:
+                    continue
+
+                start = time.time()
+                results = device._read_registers(rtype, plans[device])
+                end = time.time()
+
+                if results:
+                    values[device] = {k: v * device.get_scaling(k) for k, v in results.items()} if scaling else results
+                    timestamps[device] = (start + end) / 2
+
+        others = {}
+
+        if rest:
+            for device in devices:
+                if rest is True:
+                    slow = [k for k, v in device.registers.items() if v.rtype == rtype and k not in plans[device]]
+                else:
+                    slow = [k for k in rest if k in device.registers and device.registers[k].rtype == rtype]
+
+                if slow:
+                    others[device] = device.read_all(rtype, scaling, slow)
+
+        return BusSnapshot(values, timestamps, others)
+
+    def run(self, callback, limit=None, stop=None):
+        if stop is None:
+            stop = threading.Event()
+
+        while not stop.is_set():
+            for device, values in self.poll(limit).items():
+                callback(device, values)
+
+            due = self.next_due()
+
+            if due is None:
+                stop.wait(1)
+            else:
+                stop.wait(max(0, due - time.monotonic()))
@@ -0,0 +1,74 @@
+import time
+
+from sdm_modbus import meter
+
+
+TTL = 300
+
+
+class RegisterCache:
+
+    def __init__(self, ttl=None, keys=None):
+        # TTLs in seconds per register type and per key, where a key's TTL
+        # takes precedence. Registers with a TTL of 0 or None are not cached.
+        if ttl is None:
+            ttl = {meter.registerType.HOLDING: TTL}
+
+        self.ttl = dict(ttl)
+        self.keys = dict(keys or {})
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(values={len(self.values)}, hits={self.hits}, misses={self.misses})"
+
+    def get_ttl(self, key, rtype):
+        if key in self.keys:
+            return self.keys[key]
+
+        return self.ttl.get(rtype)
+
+    def lookup(self, keys):
+        now = time.monotonic()
+        hits = {}
+        misses = []
+
+        for k in keys:
+            cached = self.values.get(k)
+
+            if cached is not None and cached[0] > now:
+                hits[k] = cached[1]
+            else:
+                misses.append(k)
+
+        self.hits += len(hits)
+        self.misses += len(misses)
+
+        return hits, misses
+
+    def store(self, values, rtype):
+        now = time.monotonic()
+
+        for k, v in values.items():
+            ttl = self.get_ttl(k, rtype)
+
+            if ttl:
+                self.values[k] = (now + ttl, v)
+
+    def invalidate(self, keys=None):
+        if keys is None:
+            self.values.clear()
+        else:
+            for k in keys:
+                self.values.pop(k, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+
+        return {
+            "values": len(self.values),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ratio": self.hits / total if total else 0
+        }
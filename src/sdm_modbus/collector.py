@@ -0,0 +1,362 @@
+import importlib
+import multiprocessing
+import queue
+import struct
+import time
+
+from multiprocessing import shared_memory
+
+from sdm_modbus import meter
+from sdm_modbus.retry import errorType
+
+
+PROCESSES = 4
+CAPACITY = 1 << 20
+
+# Bytes written, bytes read and waits for the reader, each counter is only
+# updated by one side of the ring
+COUNTERS = struct.Struct("<QQQ")
+COUNTER = struct.Struct("<Q")
+LENGTH = struct.Struct("<I")
+
+# Record length, meter index, timestamp, elapsed, error, exception code
+RECORD = struct.Struct("<IIdfBB")
+
+
+class RingBuffer:
+
+    def __init__(self, capacity=CAPACITY, name=None):
+        # Single producer, single consumer ring of variable length records
+        # in shared memory. Records are 8 byte aligned and never wrap, a
+        # zero length marks the unused end of the ring.
+        self.capacity = capacity - capacity % 8
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=COUNTERS.size + self.capacity)
+            COUNTERS.pack_into(self.shm.buf, 0, 0, 0, 0)
+        else:
+            # Spawned processes share the creator's resource tracker, so
+            # attaching doesn't take over unlinking the segment
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.name = self.shm.name
+        self.data = self.shm.buf[COUNTERS.size:COUNTERS.size + self.capacity]
+        self.head, self.tail, overruns = COUNTERS.unpack_from(self.shm.buf)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name}, capacity={self.capacity}, used={self.head - self.tail})"
+
+    @property
+    def overruns(self):
+        return COUNTER.unpack_from(self.shm.buf, 16)[0]
+
+    def reserve(self, size, stop=None):
+        # Position of room for a record, waiting while the reader catches up
+        size = (size + 7) & ~7
+
+        if size > self.capacity:
+            raise ValueError(f"record of {size} bytes exceeds capacity")
+
+        position = self.head % self.capacity
+        padding = self.capacity - position if position + size > self.capacity else 0
+        waited = False
+
+        while self.head + padding + size - COUNTER.unpack_from(self.shm.buf, 8)[0] > self.capacity:
+            if stop is not None and stop.is_set():
+                return None
+
+            if not waited:
+                COUNTER.pack_into(self.shm.buf, 16, self.overruns + 1)
+                waited = True
+
+            time.sleep(0.001)
+
+        if padding:
+            LENGTH.pack_into(self.data, position, 0)
+            self.head += padding
+            COUNTER.pack_into(self.shm.buf, 0, self.head)
+
+        return self.head % self.capacity
+
+    def commit(self, size):
+        self.head += (size + 7) & ~7
+        COUNTER.pack_into(self.shm.buf, 0, self.head)
+
+    def records(self):
+        # Positions of the records written so far, each is released once the
+        # caller asks for the next one
+        head = COUNTER.unpack_from(self.shm.buf, 0)[0]
+
+        while self.tail < head:
+            position = self.tail % self.capacity
+            length = LENGTH.unpack_from(self.data, position)[0]
+
+            if length == 0:
+                self.tail += self.capacity - position
+            else:
+                yield position
+                self.tail += (length + 7) & ~7
+
+            COUNTER.pack_into(self.shm.buf, 8, self.tail)
+
+    def close(self, unlink=False):
+        self.data.release()
+        self.shm.close()
+
+        if unlink:
+            self.shm.unlink()
+
+
+class RecordLayout:
+
+    def __init__(self, model, rtype=meter.registerType.INPUT, scaling=False):
+        # Values of one model as 8 byte integers or floats, after a bitmap
+        # of the keys that were read
+        self.model = model
+        self.keys = [k for k, v in model.registers.items() if v.rtype == rtype and v.decodable]
+        self.bitmap = (len(self.keys) + 7) // 8
+        self.all = (1 << len(self.keys)) - 1
+
+        codes = ""
+
+        for k in self.keys:
+            v = model.registers[k]
+            codes += "q" if v.vtype is int and (not scaling or isinstance(v.sf, int)) else "d"
+
+        self.values = struct.Struct(f"<{codes}")
+        self.size = RECORD.size + self.bitmap + self.values.size
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.model.__name__}, keys={len(self.keys)}, size={self.size})"
+
+    def pack_into(self, buffer, position, index, values, timestamp, elapsed, error=None, code=None):
+        present = 0
+        row = []
+
+        for i, k in enumerate(self.keys):
+            if k in values:
+                present |= 1 << i
+                row.append(values[k])
+            else:
+                row.append(0)
+
+        RECORD.pack_into(buffer, position, self.size, index, timestamp, elapsed, error.value if error else 0, code or 0)
+        buffer[position + RECORD.size:position + RECORD.size + self.bitmap] = present.to_bytes(self.bitmap, "little")
+        self.values.pack_into(buffer, position + RECORD.size + self.bitmap, *row)
+
+    def unpack_from(self, buffer, position):
+        present = int.from_bytes(buffer[position + RECORD.size:position + RECORD.size + self.bitmap], "little")
+        row = self.values.unpack_from(buffer, position + RECORD.size + self.bitmap)
+
+        if present == self.all:
+            return dict(zip(self.keys, row))
+
+        return {k: v for i, (k, v) in enumerate(zip(self.keys, row)) if present >> i & 1}
+
+
+class CollectorResult:
+
+    def __init__(self, index, model, values=None, error=None, code=None, timestamp=0, elapsed=0):
+        self.index = index
+        self.model = model
+        self.values = values
+        self.error = error
+        self.code = code
+        self.timestamp = timestamp
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"{self.__class__.__name__}({self.index}, {self.model.__name__}, values={len(self.values)}, error={self.error}, code={self.code}, elapsed={self.elapsed:.3f})"
+        else:
+            return f"{self.__class__.__name__}({self.index}, {self.model.__name__}, values={len(self.values)}, elapsed={self.elapsed:.3f})"
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _collect(shard, name, capacity, rtype, scaling, interval, workers, ready, cycles, stop):
+    # Runs in each collector process: polls its meters with a fleet, and
+    # packs every result straight into the shared ring
+    from sdm_modbus import fleet
+
+    ring = RingBuffer(capacity, name)
+
+    try:
+        meters = fleet.MeterFleet.from_config([entry for index, entry in shard], workers)
+    except Exception as e:
+        ready.put((name, None, repr(e)))
+        ring.close()
+        return
+
+    layouts = {}
+
+    for device in meters.meters:
+        if type(device) not in layouts:
+            layouts[type(device)] = RecordLayout(type(device), rtype, scaling)
+
+    ready.put((name, [type(device).__name__ for device in meters.meters], None))
+
+    try:
+        while not stop.is_set():
+            start = time.monotonic()
+
+            for (index, entry), (device, result) in zip(shard, meters.poll(rtype, scaling).items()):
+                layout = layouts[type(device)]
+                position = ring.reserve(layout.size, stop)
+
+                if position is None:
+                    break
+
+                # Exceptions from a poll are reported as a lost connection
+                if result.ok or isinstance(result.error, errorType):
+                    error, code = result.error, result.code
+                else:
+                    error, code = errorType.DISCONNECTED, None
+
+                layout.pack_into(ring.data, position, index, result.values or {}, result.timestamp, result.elapsed, error, code)
+                ring.commit(layout.size)
+
+            cycles.release()
+            stop.wait(max(0, interval - (time.monotonic() - start)))
+    finally:
+        meters.close()
+        meters.disconnect()
+        ring.close()
+
+
+class Collector:
+
+    def __init__(self, config, processes=PROCESSES, interval=1, rtype=meter.registerType.INPUT, scaling=False, workers=None, capacity=CAPACITY):
+        # Meters are configured as for MeterFleet.from_config(), and sharded
+        # across processes by connection so every bus has a single owner.
+        self.config = list(config)
+        self.processes = processes
+        self.interval = interval
+        self.rtype = rtype
+        self.scaling = scaling
+        self.workers = workers
+        self.capacity = capacity
+
+        self.models = [None] * len(self.config)
+        self.rings = []
+        self._processes = []
+        self._context = multiprocessing.get_context("spawn")
+        self._cycles = None
+        self._stop = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(meters={len(self.config)}, processes={len(self.shards())}, interval={self.interval})"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __iter__(self):
+        while self._processes:
+            yield from self.collect(self.interval)
+
+    def shards(self):
+        groups = {}
+
+        for index, entry in enumerate(self.config):
+            key = (entry.get("device"), entry.get("host"), entry.get("port", 502), bool(entry.get("udp")))
+            groups.setdefault(key, []).append((index, entry))
+
+        # Largest connections first, each to the least loaded process
+        shards = [[] for i in range(min(self.processes, len(groups)))]
+
+        for group in sorted(groups.values(), key=len, reverse=True):
+            min(shards, key=len).extend(group)
+
+        return shards
+
+    def start(self):
+        package = importlib.import_module("sdm_modbus")
+        ready = self._context.Queue()
+        self._cycles = self._context.Semaphore(0)
+        self._stop = self._context.Event()
+        shards = {}
+
+        try:
+            for shard in self.shards():
+                ring = RingBuffer(self.capacity)
+                process = self._context.Process(
+                    target=_collect,
+                    args=(shard, ring.name, ring.capacity, self.rtype, self.scaling, self.interval, self.workers or len(shard), ready, self._cycles, self._stop),
+                    name=f"sdm_modbus-collector-{len(self.rings)}",
+                    daemon=True
+                )
+
+                self.rings.append(ring)
+                self._processes.append(process)
+                shards[ring.name] = shard
+                process.start()
+
+            # Models are known once every process has set up its meters
+            for i in range(len(shards)):
+                while True:
+                    try:
+                        name, models, error = ready.get(timeout=1)
+                        break
+                    except queue.Empty:
+                        self._check()
+
+                if error is not None:
+                    raise RuntimeError(f"collector process failed to start: {error}")
+
+                for (index, entry), model in zip(shards[name], models):
+                    self.models[index] = RecordLayout(getattr(package, model), self.rtype, self.scaling)
+        except BaseException:
+            self.stop()
+            raise
+
+        return self
+
+    def _check(self):
+        for process in self._processes:
+            if process.exitcode is not None:
+                raise RuntimeError(f"{process.name} exited with {process.exitcode}")
+
+    def collect(self, timeout=None):
+        # Results of the meters polled since the last call, waiting up to
+        # timeout for the first ones
+        if not self._processes:
+            return []
+
+        if not self._cycles.acquire(timeout=timeout):
+            self._check()
+
+        while self._cycles.acquire(block=False):
+            pass
+
+        results = []
+
+        for ring in self.rings:
+            for position in ring.records():
+                length, index, timestamp, elapsed, error, code = RECORD.unpack_from(ring.data, position)
+                layout = self.models[index]
+
+                results.append(CollectorResult(index, layout.model, layout.unpack_from(ring.data, position), errorType(error) if error else None, code or None, timestamp, elapsed))
+
+        return results
+
+    def stop(self, timeout=5):
+        if self._stop is not None:
+            self._stop.set()
+
+        for process in self._processes:
+            process.join(timeout)
+
+            if process.exitcode is None:
+                process.terminate()
+                process.join()
+
+        for ring in self.rings:
+            ring.close(unlink=True)
+
+        self._processes = []
+        self.rings = []
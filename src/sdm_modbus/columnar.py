@@ -0,0 +1,104 @@
+import functools
+
+from pymodbus.constants import Endian
+
+from sdm_modbus import meter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+NUMPY_FORMATS = {
+    meter.registerDataType.UINT16: "u2",
+    meter.registerDataType.UINT32: "u4",
+    meter.registerDataType.UINT64: "u8",
+    meter.registerDataType.INT16: "i2",
+    meter.registerDataType.INT32: "i4",
+    meter.registerDataType.INT64: "i8",
+    meter.registerDataType.FLOAT16: "f2",
+    meter.registerDataType.FLOAT32: "f4"
+}
+
+
+class ColumnarPlan:
+
+    def __init__(self, plan, wordorder=Endian.BIG):
+        if numpy is None:
+            raise ImportError("columnar decoding requires numpy, install sdm_modbus[numpy]")
+
+        # Same trick as DecodePlan: words stored in the meter's word order
+        # make every value readable as a single little or big endian field.
+        endian = "<" if wordorder == Endian.LITTLE else ">"
+
+        self.plan = plan
+        self.words = numpy.dtype(f"{endian}u2")
+        self.dtype = numpy.dtype({
+            "names": plan.keys,
+            "formats": [endian + NUMPY_FORMATS[plan.values[k].dtype] for k in plan.keys],
+            "offsets": [(plan.values[k].address - plan.offset) * 2 for k in plan.keys],
+            "itemsize": plan.length * 2
+        })
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.plan!r})"
+
+    def decode(self, blocks):
+        valid = numpy.array([block is not None for block in blocks], dtype=bool)
+        words = numpy.zeros((len(blocks), self.plan.length), dtype=self.words)
+
+        if valid.any():
+            words[valid] = [block for block in blocks if block is not None]
+
+        return numpy.frombuffer(words.tobytes(), dtype=self.dtype), valid
+
+
+@functools.lru_cache(maxsize=meter.PLAN_CACHE)
+def _columnar_plans(model, rtype, keys, wordorder, max_gap, max_registers):
+    return [ColumnarPlan(plan, wordorder) for plan in meter._decode_plans(model, rtype, keys, wordorder, max_gap, max_registers)]
+
+
+def columnar_plans(device, rtype=meter.registerType.INPUT, keys=None):
+    # Cached like the decode plans they are built from, under the same key
+    if keys is not None:
+        keys = frozenset(keys)
+
+    return _columnar_plans(device.__class__, rtype, keys, device.wordorder, device.max_gap, device.max_registers)
+
+
+def decode_columns(device, blocks, rtype=meter.registerType.INPUT, scaling=False, keys=None):
+    # blocks holds, per meter, the raw registers of every plan of device's
+    # model, or None where a request failed.
+    columns = {}
+
+    for i, columnar in enumerate(columnar_plans(device, rtype, keys)):
+        records, valid = columnar.decode([meter_blocks[i] for meter_blocks in blocks])
+
+        for k in columnar.plan.keys:
+            register = device.registers[k]
+            column = records[k]
+
+            if scaling and register.sf != 1:
+                column = column * register.sf
+            elif register.vtype is int and column.dtype.kind == "f":
+                column = column.astype(numpy.int64)
+            elif register.vtype is float and column.dtype.kind != "f":
+                column = column.astype(numpy.float64)
+
+            columns[k] = numpy.ma.masked_array(numpy.ascontiguousarray(column, dtype=column.dtype.newbyteorder("=")), mask=~valid)
+
+    return columns
+
+
+def read_columns(meters, rtype=meter.registerType.INPUT, scaling=False, keys=None):
+    meters = list(meters)
+
+    if not meters:
+        return {}
+
+    for device in meters:
+        if type(device) is not type(meters[0]) or device.wordorder != meters[0].wordorder:
+            raise ValueError(f"{device} is not a {meters[0].model}")
+
+    return decode_columns(meters[0], [device._read_blocks(rtype, keys)[1] for device in meters], rtype, scaling, keys)
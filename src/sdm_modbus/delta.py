@@ -0,0 +1,91 @@
+REFRESH = 60
+
+
+class DeltaFilter:
+
+    def __init__(self, deadbands=None, keys=None, refresh=REFRESH):
+        # Deadbands per unit string, as in a register's fmt, and per key,
+        # where a key's deadband takes precedence. A deadband is a tuple of
+        # an absolute and a relative change, either of which may be None,
+        # in scaled units. Keys without a deadband report any change.
+        self.deadbands = dict(deadbands or {})
+        self.keys = dict(keys or {})
+        self.refresh = refresh
+        self.values = {}
+        self.cycles = {}
+        self.reported = 0
+        self.suppressed = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(values={len(self.values)}, refresh={self.refresh}, reported={self.reported}, suppressed={self.suppressed})"
+
+    def get_deadband(self, key, register):
+        if key in self.keys:
+            return self.keys[key]
+
+        if isinstance(register.fmt, str):
+            return self.deadbands.get(register.fmt)
+
+        return None
+
+    def changed(self, old, new, deadband):
+        if deadband is None or not isinstance(new, (int, float)):
+            return old != new
+
+        absolute, relative = deadband
+        delta = abs(new - old)
+
+        # A NaN never equals anything, only report it once
+        if delta != delta:
+            return (old == old) or (new == new)
+
+        return delta > max(absolute or 0, (relative or 0) * abs(old))
+
+    def filter(self, values, registers, rtype, scaled=False):
+        # Every refresh cycles all values are reported, changed or not
+        cycle = self.cycles.get(rtype, 0)
+        self.cycles[rtype] = cycle + 1
+
+        if self.refresh and cycle % self.refresh == 0:
+            changes = dict(values)
+        else:
+            changes = {}
+
+            for k, v in values.items():
+                if k not in self.values:
+                    changes[k] = v
+                    continue
+
+                register = registers[k]
+                old, new = self.values[k], v
+
+                # Deadbands are in scaled units
+                if not scaled and register.sf != 1 and isinstance(new, (int, float)):
+                    old, new = old * register.sf, new * register.sf
+
+                if self.changed(old, new, self.get_deadband(k, register)):
+                    changes[k] = v
+
+        self.values.update(changes)
+        self.reported += len(changes)
+        self.suppressed += len(values) - len(changes)
+
+        return changes
+
+    def reset(self, keys=None):
+        if keys is None:
+            self.values.clear()
+            self.cycles.clear()
+        else:
+            for k in keys:
+                self.values.pop(k, None)
+
+    def stats(self):
+        total = self.reported + self.suppressed
+
+        return {
+            "values": len(self.values),
+            "reported": self.reported,
+            "suppressed": self.suppressed,
+            "ratio": self.suppressed / total if total else 0
+        }
@@ -0,0 +1,198 @@
+import json
+import math
+import os
+import struct
+import threading
+import time
+
+from sdm_modbus import meter
+
+
+SAVE_INTERVAL = 60
+
+# Counter units in watt hours, and power units in watts, to integrate power
+# into the counter's unit
+COUNTERS = {"Wh": 1, "kWh": 1000, "kVArh": 1000, "Kvarh": 1000, "kVAh": 1000}
+POWER = {"W": 1, "VAr": 1, "VA": 1}
+
+
+def resolution(register, value):
+    # Smallest step a counter can show at its current value
+    if register.dtype == meter.registerDataType.FLOAT32:
+        return math.ldexp(1, math.frexp(abs(value))[1] - 24) * abs(register.sf) if value else 0
+
+    return abs(register.sf)
+
+
+class CounterState:
+    __slots__ = ("value", "timestamp", "total", "resets", "rollovers", "power", "pending", "plateau")
+
+    def __init__(self, value, timestamp, total=0, resets=0, rollovers=0, power=None, pending=0, plateau=False):
+        self.value = value
+        self.timestamp = timestamp
+        self.total = total
+        self.resets = resets
+        self.rollovers = rollovers
+        self.power = power
+        self.pending = pending
+        self.plateau = plateau
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(value={self.value}, total={self.total}, resets={self.resets}, rollovers={self.rollovers}, plateau={self.plateau})"
+
+
+class EnergyAccumulator:
+
+    def __init__(self, keys=None, power=None, path=None, save_interval=SAVE_INTERVAL):
+        # Consumption per counter, all counters unless keys are given. power
+        # maps counters to the power register integrated alongside them, to
+        # estimate what a reset hid and to notice plateaus. With a path the
+        # state is saved every save_interval seconds and loaded on start.
+        self.keys = keys
+        self.power = dict(power or {})
+        self.path = os.path.expanduser(path) if path else None
+        self.save_interval = save_interval
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.saved = time.monotonic()
+
+        if self.path:
+            try:
+                with open(self.path) as f:
+                    self.counters = {k: CounterState(*v) for k, v in json.load(f).items()}
+            except (OSError, ValueError, TypeError):
+                pass
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(counters={len(self.counters)}, path={self.path!r})"
+
+    def read_keys(self, registers):
+        # Counters and the power registers integrated with them
+        if self.keys is None:
+            keys = [k for k, v in registers.items() if v.rtype == meter.registerType.INPUT and v.fmt in COUNTERS]
+        else:
+            keys = list(self.keys)
+
+        return keys + [v for k, v in self.power.items() if k in keys and v not in keys]
+
+    def update(self, values, registers, timestamp=None):
+        # Scaled counter values of one poll, returns the consumption per
+        # counter since the previous poll
+        timestamp = time.time() if timestamp is None else timestamp
+        deltas = {}
+
+        with self.lock:
+            for k, value in values.items():
+                register = registers[k]
+
+                if register.fmt not in COUNTERS or (self.keys is not None and k not in self.keys):
+                    continue
+
+                power = self.power.get(k)
+                watts = values.get(power) if power else None
+                state = self.counters.get(k)
+
+                if watts != watts:
+                    watts = None
+
+                if value != value:
+                    continue
+
+                if state is None:
+                    self.counters[k] = CounterState(value, timestamp, power=watts)
+                    deltas[k] = 0
+                    continue
+
+                estimate = None
+
+                if watts is not None and state.power is not None:
+                    estimate = max(0, (state.power + watts) / 2 * POWER.get(registers[power].fmt, 1) * (timestamp - state.timestamp) / 3600 / COUNTERS[register.fmt])
+
+                step = resolution(register, value)
+                steps = self._steps(register, state.value, value)
+
+                if steps is not None:
+                    delta = steps * register.sf
+
+                    if steps >= 0 and value < state.value:
+                        state.rollovers += 1
+                else:
+                    delta = value - state.value
+
+                    # Jitter within a float counter's resolution
+                    if -step <= delta < 0:
+                        delta = 0
+                        value = state.value
+
+                if delta < 0:
+                    # Consumption since the reset is the new value, what came
+                    # before it since the last poll is estimated
+                    delta = max(value, estimate or 0)
+                    state.resets += 1
+
+                # A float counter stops moving once its resolution exceeds
+                # the consumption between polls
+                if delta == 0 and estimate is not None:
+                    state.pending += estimate
+                    state.plateau = state.pending > step
+                else:
+                    state.pending = 0
+                    state.plateau = False
+
+                state.value = value
+                state.timestamp = timestamp
+                state.power = watts
+                state.total += delta
+                deltas[k] = delta
+
+        if self.path and time.monotonic() - self.saved >= self.save_interval:
+            self.save()
+
+        return deltas
+
+    def _steps(self, register, old, new):
+        # Integer counters wrap at their maximum: a step forward modulo the
+        # range is consumption, possibly across a rollover, anything else a
+        # reset, returned as a negative step
+        if register.dtype == meter.registerDataType.FLOAT32:
+            return None
+
+        span = 1 << (struct.calcsize(register.code) * 8)
+        steps = (round(new / register.sf) - round(old / register.sf)) % span
+
+        return steps if steps < span // 4 else -1
+
+    def totals(self):
+        with self.lock:
+            return {k: v.total for k, v in self.counters.items()}
+
+    def plateaus(self):
+        with self.lock:
+            return [k for k, v in self.counters.items() if v.plateau]
+
+    def reset(self, keys=None):
+        with self.lock:
+            if keys is None:
+                self.counters.clear()
+            else:
+                for k in keys:
+                    self.counters.pop(k, None)
+
+    def save(self):
+        if not self.path:
+            return
+
+        with self.lock:
+            state = {k: [getattr(v, name) for name in CounterState.__slots__] for k, v in self.counters.items()}
+
+        directory = os.path.dirname(self.path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write a temporary file first so a crash never leaves a partial state
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+
+        os.replace(f"{self.path}.tmp", self.path)
+        self.saved = time.monotonic()
@@ -0,0 +1,301 @@
+import concurrent.futures
+import importlib
+import time
+
+from sdm_modbus import meter
+from sdm_modbus.delta import DeltaFilter
+from sdm_modbus.retry import errorType
+
+
+WORKERS = 8
+
+
+class FleetResult:
+
+    def __init__(self, device, values=None, error=None, timestamp=0, elapsed=0, code=None):
+        # error is the exception a poll raised, or the errorType of a failed
+        # request with its exception code
+        self.device = device
+        self.values = values
+        self.error = error
+        self.code = code
+        self.timestamp = timestamp
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"{self.__class__.__name__}({self.device!r}, error={self.error!r}, code={self.code}, elapsed={self.elapsed:.3f})"
+        else:
+            return f"{self.__class__.__name__}({self.device!r}, values={len(self.values)}, elapsed={self.elapsed:.3f})"
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class MeterFleet:
+
+    def __init__(self, meters=None, workers=WORKERS):
+        self.meters = list(meters or [])
+        self.workers = workers
+        self._executor = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(meters={len(self.meters)}, connections={len(self.groups())}, workers={self.workers})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @classmethod
+    def from_config(cls, config, workers=WORKERS, detect_cache=None):
+        package = importlib.import_module("sdm_modbus")
+        parents = {}
+        meters = []
+
+        for entry in config:
+            kwargs = dict(entry)
+            model = kwargs.pop("model", "auto")
+
+            # Meters on the same connection share the client of the first one
+            probe = (kwargs.get("device"), kwargs.get("host"), kwargs.get("port", 502), bool(kwargs.get("udp")))
+
+            if model == "auto":
+                model = cls._detect(parents, probe, kwargs, detect_cache)
+            else:
+                model = getattr(package, model)
+
+            if not (isinstance(model, type) and issubclass(model, meter.Meter)):
+                raise ValueError(f"unknown model {model}")
+
+            if probe in parents:
+                device = model(parent=parents[probe], unit=kwargs.get("unit", meter.UNIT))
+            else:
+                device = model(**kwargs)
+                parents[probe] = device
+
+            meters.append(device)
+
+        return cls(meters, workers)
+
+    @staticmethod
+    def _detect(parents, probe, kwargs, detect_cache):
+        from sdm_modbus import registry
+
+        if probe in parents:
+            model = registry.detect(parents[probe], kwargs.get("unit", meter.UNIT), detect_cache)
+        else:
+            # The pool hands the detecting meter's client on to the detected model
+            device = meter.Meter(**kwargs)
+
+            try:
+                model = registry.detect(device, kwargs.get("unit", meter.UNIT), detect_cache)
+            finally:
+                device.disconnect()
+
+        if model is None:
+            raise ValueError(f"no model detected for {kwargs}")
+
+        return model
+
+    def add(self, device):
+        self.meters.append(device)
+        return device
+
+    def remove(self, device):
+        self.meters = [m for m in self.meters if m is not device]
+
+    def groups(self):
+        groups = {}
+
+        for device in self.meters:
+            groups.setdefault(device.endpoint(), []).append(device)
+
+        return groups
+
+    def _poll_group(self, devices, rtype, scaling, changes=False):
+        pipeline = devices[0].pipeline
+
+        if pipeline is not None and all(d.pipeline is pipeline and d.cache is None for d in devices):
+            return self._poll_pipeline(pipeline, devices, rtype, scaling, changes)
+
+        results = []
+
+        for device in devices:
+            timestamp = time.time()
+            start = time.monotonic()
+
+            try:
+                if changes:
+                    values = device.read_changes(rtype, scaling)
+                else:
+                    values = device.read_all(rtype, scaling)
+
+                error, code = device.read_errors[0] if device.read_errors else (None, None)
+            except Exception as e:
+                values = None
+                error, code = e, None
+
+            results.append(FleetResult(device, values, error, timestamp, time.monotonic() - start, code))
+
+        return results
+
+    def _poll_pipeline(self, pipeline, devices, rtype, scaling, changes=False):
+        # The requests of all meters behind the gateway share one window
+        timestamp = time.time()
+        start = time.monotonic()
+        plans = {}
+
+        for device in devices:
+            if device.breaker.allow():
+                plans[device] = device.plan(rtype)
+                device.read_errors = []
+            else:
+                device.read_errors = [(errorType.OFFLINE, None)]
+
+        try:
+            blocks = iter(pipeline.read([(device, rtype, plan) for device, device_plans in plans.items() for plan in device_plans]))
+            exception = None
+        except Exception as e:
+            exception = e
+
+        elapsed = time.monotonic() - start
+        results = []
+
+        for device in devices:
+            if exception is not None:
+                results.append(FleetResult(device, None, exception, timestamp, elapsed))
+                continue
+
+            values = {}
+
+            for plan in plans.get(device, []):
+                registers = next(blocks)
+
+                if registers:
+                    values.update(plan.decode(registers))
+
+            if scaling:
+                values = {k: v * device.get_scaling(k) for k, v in values.items()}
+
+            if changes:
+                if device.delta is None:
+                    device.delta = DeltaFilter()
+
+                values = device.delta.filter(values, device.registers, rtype, scaling)
+
+            error, code = device.read_errors[0] if device.read_errors else (None, None)
+            results.append(FleetResult(device, values, error, timestamp, elapsed, code))
+
+        return results
+
+    def poll(self, rtype=meter.registerType.INPUT, scaling=False, changes=False):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sdm_modbus")
+
+        futures = [self._executor.submit(self._poll_group, devices, rtype, scaling, changes) for devices in self.groups().values()]
+        results = {}
+
+        for future in futures:
+            for result in future.result():
+                results[result.device] = result
+
+        return {device: results[device] for device in self.meters}
+
+    def _write_group(self, devices, values, kwargs):
+        results = []
+
+        for device in devices:
+            timestamp = time.time()
+            start = time.monotonic()
+
+            try:
+                written = device.write_many(values, **kwargs)
+                error = None
+            except Exception as e:
+                written = None
+                error = e
+
+            results.append(FleetResult(device, written, error, timestamp, time.monotonic() - start))
+
+        return results
+
+    def write_many(self, values, **kwargs):
+        # Meters on different connections are written in parallel, the
+        # values of each FleetResult tell which keys were written
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sdm_modbus")
+
+        futures = [self._executor.submit(self._write_group, devices, values, kwargs) for devices in self.groups().values()]
+        results = {}
+
+        for future in futures:
+            for result in future.result():
+                results[result.device] = result
+
+        return {device: results[device] for device in self.meters}
+
+    def _read_group_blocks(self, devices, rtype, keys):
+        results = []
+
+        for device in devices:
+            try:
+                blocks = device._read_blocks(rtype, keys)[1]
+            except Exception:
+                blocks = [None] * len(device.plan(rtype, keys))
+
+            results.append((device, blocks))
+
+        return results
+
+    def read_columns(self, rtype=meter.registerType.INPUT, scaling=False, keys=None):
+        # Imported here so fleets that never decode columns don't load numpy
+        from sdm_modbus import columnar
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sdm_modbus")
+
+        futures = [self._executor.submit(self._read_group_blocks, devices, rtype, keys) for devices in self.groups().values()]
+        blocks = {}
+
+        for future in futures:
+            blocks.update(future.result())
+
+        # One vectorised decode per model and word order, rows in fleet order
+        models = {}
+
+        for device in self.meters:
+            models.setdefault(type(device), {}).setdefault(device.wordorder, []).append(device)
+
+        results = {}
+
+        for model, orders in models.items():
+            groups = [(devices, columnar.decode_columns(devices[0], [blocks[d] for d in devices], rtype, scaling, keys)) for devices in orders.values()]
+
+            if len(groups) == 1:
+                results[model] = groups[0]
+                continue
+
+            # Meters of one model with different word orders are decoded
+            # apart, then put back in fleet order
+            devices = [d for d in self.meters if type(d) is model]
+            rows = {d: i for i, d in enumerate(d for group, columns in groups for d in group)}
+            order = [rows[d] for d in devices]
+
+            results[model] = (devices, {k: columnar.numpy.ma.concatenate([columns[k] for group, columns in groups])[order] for k in groups[0][1]})
+
+        return results
+
+    def read_all(self, rtype=meter.registerType.INPUT, scaling=False):
+        return {device: result.values for device, result in self.poll(rtype, scaling).items() if result.values is not None}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def disconnect(self):
+        for device in self.meters:
+            device.disconnect()
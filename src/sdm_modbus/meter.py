@@ -1,13 +1,25 @@
+import asyncio
 import enum
+import functools
 import importlib
+import struct
 import time
 
 from pymodbus.constants import Endian
-from pymodbus.client import ModbusTcpClient
-from pymodbus.client import ModbusUdpClient
-from pymodbus.client import ModbusSerialClient
+from pymodbus.exceptions import ConnectionException
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
 from pymodbus.pdu.register_message import ReadInputRegistersResponse
 from pymodbus.pdu.register_message import ReadHoldingRegistersResponse
+from pymodbus.framer import FramerType
+
+from sdm_modbus import energy
+from sdm_modbus import pool
+from sdm_modbus import snapshot
+from sdm_modbus.delta import DeltaFilter
+from sdm_modbus.pipeline import Pipeline
+from sdm_modbus.retry import RetryPolicy
+from sdm_modbus.retry import errorType
 
 
 class connectionType(enum.Enum):
@@ -40,11 +52,202 @@ RETRIES = 3
 TIMEOUT = 1
 UNIT = 1
 
+MAX_REGISTERS = 125
+MAX_WRITE_REGISTERS = 123
+MAX_GAP = 16
+
+# Decode plans kept for distinct (model, register type, keys) combinations
+PLAN_CACHE = 256
+
+
+STRUCT_FORMATS = {
+    registerDataType.UINT16: "H",
+    registerDataType.UINT32: "I",
+    registerDataType.UINT64: "Q",
+    registerDataType.INT16: "h",
+    registerDataType.INT32: "i",
+    registerDataType.INT64: "q",
+    registerDataType.FLOAT16: "e",
+    registerDataType.FLOAT32: "f"
+}
+
+
+class Register:
+    __slots__ = ("address", "length", "rtype", "dtype", "vtype", "label", "fmt", "batch", "sf", "end", "code", "decodable")
+
+    def __init__(self, address, length, rtype, dtype, vtype, label, fmt, batch=1, sf=1):
+        for name, value in zip(self.__slots__, (address, length, rtype, dtype, vtype, label, fmt, batch, sf)):
+            object.__setattr__(self, name, value)
+
+        code = STRUCT_FORMATS.get(dtype)
+
+        object.__setattr__(self, "end", address + length)
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "decodable", code is not None and struct.calcsize(code) == length * 2)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}{tuple(self)!r}"
+
+    # Registers behave as the 9-tuples they replace, so existing code
+    # unpacking or indexing them keeps working.
+    def __iter__(self):
+        return iter((self.address, self.length, self.rtype, self.dtype, self.vtype, self.label, self.fmt, self.batch, self.sf))
+
+    def __len__(self):
+        return 9
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, (Register, tuple)):
+            return NotImplemented
+
+        return tuple(self) == tuple(other)
+
+    def __hash__(self):
+        return hash((self.address, self.length, self.rtype, self.dtype, self.label))
+
+    def unpacker(self, wordorder=Endian.BIG):
+        return _unpackers[("<" if wordorder == Endian.LITTLE else ">") + self.code]
+
+
+_unpackers = {endian + code: struct.Struct(endian + code) for code in STRUCT_FORMATS.values() for endian in "<>"}
+
+
+def register_map(registers):
+    return {k: v if isinstance(v, Register) else Register(*v) for k, v in registers.items()}
+
+
+def load_client(client):
+    # Clients may be given as dotted paths, which are only imported once a
+    # meter needs them.
+    if isinstance(client, str):
+        module, name = client.rsplit(".", 1)
+        return getattr(importlib.import_module(module), name)
+
+    return client
+
+
+def plan_reads(registers, max_gap=MAX_GAP, max_registers=MAX_REGISTERS):
+    spans = []
+
+    for k, v in sorted(registers.items(), key=lambda i: i[1].address):
+        address = v.address
+        end = v.end
+
+        if spans:
+            span = spans[-1]
+
+            if (address - span[1] <= max_gap
+                    and max(span[1], end) - span[0] <= max_registers):
+                span[1] = max(span[1], end)
+                span[2][k] = v
+                continue
+
+        spans.append([address, end, {k: v}])
+
+    return [(start, end - start, values) for start, end, values in spans]
+
+
+def plan_writes(registers, max_registers=MAX_WRITE_REGISTERS):
+    # Registers, given with their encoded words, that follow each other
+    # without a gap are written with a single request.
+    blocks = []
+
+    for k, (v, words) in sorted(registers.items(), key=lambda i: i[1][0].address):
+        if blocks:
+            address, block, keys = blocks[-1]
+
+            if v.address < address + len(block):
+                raise ValueError(f"overlapping registers {keys[-1]} and {k}")
+
+            if v.address == address + len(block) and len(block) + len(words) <= max_registers:
+                block.extend(words)
+                keys.append(k)
+                continue
+
+        blocks.append((v.address, list(words), [k]))
+
+    return blocks
+
+
+class DecodePlan:
+
+    def __init__(self, offset, length, values, wordorder=Endian.BIG):
+        # Packing the words in the meter's word order lets a single struct
+        # decode every value of the block, whatever its word order.
+        endian = "<" if wordorder == Endian.LITTLE else ">"
+
+        self.offset = offset
+        self.length = length
+        self.values = values
+        self.words = struct.Struct(f"{endian}{length}H")
+
+        self.keys = []
+        self.vtypes = []
+        self.unpackers = []
+
+        fmt = endian
+        position = offset
+        overlapping = False
+
+        for k, v in sorted(values.items(), key=lambda i: i[1].address):
+            if v.code is None:
+                raise NotImplementedError(v.dtype)
+
+            if not v.decodable:
+                continue
+
+            if v.address < position:
+                overlapping = True
+            else:
+                fmt += "x" * ((v.address - position) * 2)
+                position = v.end
+
+            fmt += v.code
+
+            self.keys.append(k)
+            self.vtypes.append(v.vtype)
+            self.unpackers.append((v.unpacker(wordorder), (v.address - offset) * 2))
+
+        if overlapping:
+            self.struct = None
+        else:
+            self.struct = struct.Struct(fmt)
+            self.unpackers = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(offset={self.offset}, length={self.length}, keys={len(self.keys)})"
+
+    def decode(self, registers):
+        data = self.words.pack(*registers)
+
+        if self.struct:
+            raw = self.struct.unpack_from(data)
+        else:
+            raw = [unpacker.unpack_from(data, position)[0] for unpacker, position in self.unpackers]
+
+        return {k: vtype(v) for k, vtype, v in zip(self.keys, self.vtypes, raw)}
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE)
+def _decode_plans(model, rtype, keys, wordorder, max_gap, max_registers):
+    registers = {k: v for k, v in model.registers.items() if (v.rtype == rtype and (keys is None or k in keys))}
+    return [DecodePlan(offset, length, values, wordorder) for offset, length, values in plan_reads(registers, max_gap, max_registers)]
+
 
 class Meter:
     model = "Generic"
     registers = {}
 
+    # Registers read by detect() to identify the model, mapped to the range
+    # of plausible scaled values, or None when any answer will do.
+    probes = {}
+
     stopbits = 1
     parity = "N"
     baud = 38400
@@ -54,15 +257,50 @@ class Meter:
     
     udp = False
 
+    max_registers = MAX_REGISTERS
+    max_gap = MAX_GAP
+
+    tcp_client = "pymodbus.client.ModbusTcpClient"
+    udp_client = "pymodbus.client.ModbusUdpClient"
+    serial_client = "pymodbus.client.ModbusSerialClient"
+
+    # Pooled clients stay open for the pool's idle_timeout once released
+    linger = True
+
     def __init__(self, **kwargs):
+        self._setup(**kwargs)
+        self.connect()
+
+    def _setup(self, **kwargs):
         parent = kwargs.get("parent")
 
+        self.max_registers = min(kwargs.get("max_registers", self.max_registers), MAX_REGISTERS)
+        self.max_gap = kwargs.get("max_gap", self.max_gap)
+        self.last_error = None
+        self.read_errors = []
+        self.cache = kwargs.get("cache")
+        self.delta = kwargs.get("delta")
+        self.energy = kwargs.get("energy")
+        self.metrics = kwargs.get("metrics", parent.metrics if parent else None)
+
         if parent:
             self.client = parent.client
+            self.lock = parent.lock
+            self.pool = parent.pool
+            self.connection = parent.connection
+            self._connection_key = parent._connection_key
+            self._client_factory = parent._client_factory
+
+            if self.connection is not None:
+                self.pool.retain(self.connection)
+
             self.mode = parent.mode
             self.timeout = parent.timeout
-            self.retries = parent.retries
+            self.retry = kwargs.get("retry", parent.retry)
+            self.retries = self.retry.retries
+            self.breaker = self.retry.breaker()
             self.framer = parent.framer
+            self.pipeline = parent.pipeline
 
             unit = kwargs.get("unit")
 
@@ -86,22 +324,24 @@ class Meter:
                 raise NotImplementedError(self.mode)
         else:
             self.timeout = kwargs.get("timeout", TIMEOUT)
-            self.retries = kwargs.get("retries", RETRIES)
+            self.retry = kwargs.get("retry") or RetryPolicy(retries=kwargs.get("retries", RETRIES))
+            self.retries = self.retry.retries
+            self.breaker = self.retry.breaker()
             self.unit = kwargs.get("unit", UNIT)
+            self.pool = kwargs.get("pool", pool.DEFAULT_POOL)
 
-            client_args = {}
+            # Retries are handled by the meter's retry policy
+            client_args = {"retries": 0}
 
             framer_name = kwargs.get("framer")
             if framer_name is None:
                 self.framer = None
             else:
                 try:
-                    framer_package_name = f"pymodbus.framer.{framer_name}_framer"
-                    framer_class_name = f"Modbus{framer_name[0].upper()}{framer_name[1:]}Framer"
-                    self.framer = importlib.import_module(framer_package_name).__getattribute__(framer_class_name)
+                    self.framer = FramerType(framer_name)
                     client_args["framer"] = self.framer
-                except Exception as e:
-                    raise ValueError(f"failed to import {framer_name} framer: {e}")
+                except ValueError:
+                    raise ValueError(f"unknown framer {framer_name}")
 
             device = kwargs.get("device")
             
@@ -129,8 +369,11 @@ class Meter:
                     self.baud = baud
 
                 self.mode = connectionType.RTU
-                self.client = ModbusSerialClient(
-                    method="rtu",
+                client = load_client(self.serial_client)
+
+                self._connection_key = (client, self.device, self.baud, self.parity, self.stopbits)
+                self._client_factory = functools.partial(
+                    client,
                     port=self.device,
                     stopbits=self.stopbits,
                     parity=self.parity,
@@ -144,7 +387,11 @@ class Meter:
                 
                 self.mode = connectionType.UDP
 
-                self.client = ModbusUdpClient(
+                client = load_client(self.udp_client)
+
+                self._connection_key = (client, self.host, self.port, self.framer, self.timeout)
+                self._client_factory = functools.partial(
+                    client,
                     host=self.host,
                     port=self.port,
                     timeout=self.timeout,
@@ -156,17 +403,58 @@ class Meter:
                 
                 self.mode = connectionType.TCP
 
-                self.client = ModbusTcpClient(
+                client = load_client(self.tcp_client)
+
+                self._connection_key = (client, self.host, self.port, self.framer, self.timeout)
+                self._client_factory = functools.partial(
+                    client,
                     host=self.host,
                     port=self.port,
                     timeout=self.timeout,
                     **client_args
                 )
 
-        self.connect()
+            # Reads can keep several requests in flight on a Modbus TCP
+            # connection, pipeline sets how many
+            window = kwargs.get("pipeline")
+
+            if window:
+                if self.mode is not connectionType.TCP or self.framer not in (None, FramerType.SOCKET):
+                    raise ValueError("pipelining needs a Modbus TCP connection")
+
+                self.pipeline = Pipeline(self.host, self.port, window, self.timeout)
+            else:
+                self.pipeline = None
+
+            self._acquire()
+
+    def _acquire(self):
+        # Meters on the same endpoint share a pooled client and its lock,
+        # unless pooling was disabled with pool=False.
+        if self.pool:
+            self.connection = self.pool.acquire(self._pool_key(), self._client_factory)
+
+            # A serial port takes a single client, which can't change its
+            # timeout per meter
+            timeout = self.connection.client.comm_params.timeout_connect
+
+            if self.mode is connectionType.RTU and timeout != self.timeout:
+                self.pool.release(self.connection)
+                self.connection = None
+                raise ValueError(f"{self.device} is already open with a timeout of {timeout}")
+
+            self.client = self.connection.client
+            self.lock = self.connection.lock
+        else:
+            self.connection = None
+            self.client = self._client_factory()
+            self.lock = pool.BusLock()
+
+    def _pool_key(self):
+        return self._connection_key
 
     def __repr__(self):
-        framer_name = self.framer.__name__ if self.framer is not None else "default"
+        framer_name = self.framer.value if self.framer is not None else "default"
         if self.mode == connectionType.RTU:
             return f"{self.model}({self.device}, {self.mode}: stopbits={self.stopbits}, parity={self.parity}, baud={self.baud}, timeout={self.timeout}, retries={self.retries}, unit={hex(self.unit)}, framer={framer_name})"
         elif self.mode == connectionType.TCP:
@@ -176,44 +464,94 @@ class Meter:
         else:
             return f"<{self.__class__.__module__}.{self.__class__.__name__} object at {hex(id(self))}>"
 
-    def _read_input_registers(self, address, length):
-        for i in range(self.retries):
-            if not self.connected():
-                self.connect()
-                time.sleep(0.1)
-                continue
+    def _check_response(self, result, response, length):
+        if isinstance(result, ExceptionResponse):
+            return errorType.EXCEPTION, result.exception_code
+        if not isinstance(result, response):
+            return errorType.SHORT, None
+        if len(result.registers) != length:
+            return errorType.SHORT, None
 
-            result = self.client.read_input_registers(address=address, count=length, slave=self.unit)
+        return None, None
 
-            if not isinstance(result, ReadInputRegistersResponse):
-                continue
-            if len(result.registers) != length:
-                continue
+    def _record(self, error, code=None):
+        if error is None:
+            self.last_error = None
+        else:
+            self.last_error = (error, code)
 
-            return result.registers
+        # Modbus exceptions other than gateway failures show the meter is alive
+        if error is not None and self.retry.offline(error, code):
+            self.breaker.failure()
+        else:
+            self.breaker.success()
 
-        return None
+    def _request(self, function, response, address, length):
+        error = None
+        attempts = 0
+        start = time.monotonic()
+
+        for attempt in range(self.retries):
+            if attempt:
+                time.sleep(self.retry.delay(attempt))
 
-    def _read_holding_registers(self, address, length):
-        for i in range(self.retries):
             if not self.connected():
                 self.connect()
-                time.sleep(0.1)
+
+            if not self.connected():
+                error, code = errorType.DISCONNECTED, None
                 continue
 
-            result = self.client.read_holding_registers(address=address, count=length, slave=self.unit)
+            try:
+                attempts += 1
 
-            if not isinstance(result, ReadHoldingRegistersResponse):
-                continue
-            if len(result.registers) != length:
-                continue
-            
-            return result.registers
+                with self.lock:
+                    result = function(address=address, count=length, slave=self.unit)
+
+                error, code = self._check_response(result, response, length)
+            except ConnectionException:
+                error, code = errorType.DISCONNECTED, None
+            except ModbusIOException:
+                error, code = errorType.TIMEOUT, None
+
+            if error is None:
+                self._record(None)
+                self._observe(function.__name__, address, length, start, attempts)
+                return result.registers
+
+            if not self.retry.retry(error, code):
+                break
+
+        if error is not None:
+            self._record(error, code)
+            self._observe(function.__name__, address, length, start, attempts, error, code)
 
         return None
 
+    def _observe(self, function, address, length, start, attempts, error=None, code=None):
+        if self.metrics is not None:
+            self.metrics.observe(self, function, address, length, time.monotonic() - start, attempts, error, code)
+
+    def _read_input_registers(self, address, length):
+        return self._request(self.client.read_input_registers, ReadInputRegistersResponse, address, length)
+
+    def _read_holding_registers(self, address, length):
+        return self._request(self.client.read_holding_registers, ReadHoldingRegistersResponse, address, length)
+
     def _write_holding_register(self, address, value):
-        return self.client.write_registers(address=address, values=value)
+        start = time.monotonic()
+
+        with self.lock:
+            result = self.client.write_registers(address=address, values=value, slave=self.unit)
+
+        self._observe("write_registers", address, len(value), start, 1, *self._check_write(result))
+        return result
+
+    def _check_write(self, result):
+        if isinstance(result, ExceptionResponse):
+            return errorType.EXCEPTION, result.exception_code
+
+        return None, None
    
     def _convert_data_type(self, dtype):
         try:
@@ -232,123 +570,637 @@ class Meter:
         except NotImplementedError:
             raise
 
+    def _encode(self, register, data):
+        # Scaled values come in as floats, integer registers need integers
+        if register.dtype != registerDataType.FLOAT32:
+            data = int(round(data))
+
+        return self.client.convert_to_registers(data, self._convert_data_type(register.dtype), self._endian_enum_to_string(self.wordorder))
+
     def _endian_enum_to_string(self, e):
         if e == Endian.BIG:
             return "big"
         elif e == Endian.LITTLE:
             return "little"
         else:
-            raise NotImplementedError(dtype)
+            raise NotImplementedError(e)
+
+    def _read(self, key):
+        rtype = self.registers[key].rtype
 
-    def _read(self, value):
-        address, length, rtype, dtype, vtype, label, fmt, batch, sf = value
+        for plan in self.plan(rtype, (key,)):
+            return self._read_all(plan, rtype).get(key)
 
+    def _read_block(self, plan, rtype):
         try:
             if rtype == registerType.INPUT:
-                return vtype(self.client.convert_from_registers(self._read_input_registers(address, length), self._convert_data_type(dtype), self._endian_enum_to_string(self.wordorder)))
+                return self._read_input_registers(plan.offset, plan.length)
             elif rtype == registerType.HOLDING:
-                return vtype(self.client.convert_from_registers(self._read_holding_registers(address, length), self._convert_data_type(dtype), self._endian_enum_to_string(self.wordorder)))
+                return self._read_holding_registers(plan.offset, plan.length)
             else:
                 raise NotImplementedError(rtype)
         except NotImplementedError:
             raise
 
-    def _read_all(self, values, rtype):
-        addr_min = False
-        addr_max = False
-
-        for k, v in values.items():
-            v_addr = v[0]
-            v_length = v[1]
-
-            if addr_min is False:
-                addr_min = v_addr
-            if addr_max is False:
-                addr_max = v_addr + v_length
+    def _read_all(self, plan, rtype):
+        registers = self._read_block(plan, rtype)
 
-            if v_addr < addr_min:
-                addr_min = v_addr
-            if (v_addr + v_length) > addr_max:
-                addr_max = v_addr + v_length
+        if not registers:
+            return {}
 
-        results = {}
-        offset = addr_min
-        length = addr_max - addr_min
-
-        try:
-            if rtype == registerType.INPUT:
-                registers = self._read_input_registers(offset, length)
-            elif rtype == registerType.HOLDING:
-                registers = self._read_holding_registers(offset, length)
-            else:
-                raise NotImplementedError(rtype)
-
-            if not registers:
-                return results
-                
-            for k, v in values.items():
-                address, length, rtype, dtype, vtype, label, fmt, batch, sf = v
-                value = self.client.convert_from_registers(registers[address:address+length], self._convert_data_type(dtype), self._endian_enum_to_string(self.wordorder))
-                if not isinstance( value, list):
-                    results[k] = vtype(value)
-
-        except NotImplementedError:
-            raise
-
-        return results
+        return plan.decode(registers)
 
     def _write(self, value, data):
-        address, length, rtype, dtype, vtype, label, fmt, batch, sf = value
-
         try:
-            if rtype == registerType.HOLDING:
-                return self._write_holding_register(address, self.client.convert_to_registers(data, self._convert_data_type(dtype), self._endian_enum_to_string(self.wordorder)))
+            if value.rtype == registerType.HOLDING:
+                return self._write_holding_register(value.address, self._encode(value, data))
             else:
-                raise NotImplementedError(rtype)
+                raise NotImplementedError(value.rtype)
         except NotImplementedError:
             raise
 
+    def endpoint(self):
+        if self.mode == connectionType.RTU:
+            return (self.mode, self.device)
+        else:
+            return (self.mode, self.host, self.port)
+
     def connect(self):
+        if self.pool and self.connection is None:
+            self._acquire()
+
         return self.client.connect()
 
     def disconnect(self):
-        self.client.close()
+        if self.pipeline is not None:
+            self.pipeline.close()
+
+        # Released pooled clients belong to the pool, which closes them
+        if self.connection is not None:
+            self.pool.release(self.connection, self.linger)
+            self.connection = None
+        elif not self.pool:
+            self.client.close()
 
     def connected(self):
+        if self.pool and self.connection is None:
+            return False
+
         return self.client.is_socket_open()
 
     def get_scaling(self, key):
-        address, length, rtype, dtype, vtype, label, fmt, batch, sf = self.registers[key]
-        return sf
+        return self.registers[key].sf
 
     def read(self, key, scaling=False):
         if key not in self.registers:
             raise KeyError(key)
 
-        if scaling:
-            return self._read(self.registers[key]) * self.get_scaling(key)
+        if self.cache is not None:
+            return self.read_all(self.registers[key].rtype, scaling, (key,)).get(key)
+
+        if not self.breaker.allow():
+            return None
+
+        value = self._read(key)
+
+        if scaling and value is not None:
+            return value * self.get_scaling(key)
         else:
-            return self._read(self.registers[key])
+            return value
 
     def write(self, key, data):
         if key not in self.registers:
             raise KeyError(key)
 
+        self._cache_invalidate(key)
+
         return self._write(self.registers[key], data / self.get_scaling(key))
 
-    def read_all(self, rtype=registerType.INPUT, scaling=False):
-        registers = {k: v for k, v in self.registers.items() if (v[2] == rtype)}
+    def _cache_keys(self, rtype, keys):
+        return [k for k, v in self.registers.items() if (v.rtype == rtype and (keys is None or k in keys))]
+
+    def _cache_invalidate(self, key):
+        if self.cache is None:
+            return
+
+        register = self.registers[key]
+
+        # Invalidate every cached register overlapping the written range
+        self.cache.invalidate([k for k, v in self.registers.items() if (v.rtype == register.rtype and v.address < register.end and register.address < v.end)])
+
+    def _encode_many(self, values, scaling=True):
+        registers = {}
+
+        for k, data in values.items():
+            if k not in self.registers:
+                raise KeyError(k)
+
+            register = self.registers[k]
+
+            if register.rtype != registerType.HOLDING:
+                raise NotImplementedError(register.rtype)
+
+            registers[k] = (register, self._encode(register, data / self.get_scaling(k) if scaling else data))
+
+        return registers
+
+    def _verify(self, registers, values):
+        # Compare with the written words decoded as a read would decode them
+        endian = "<" if self.wordorder == Endian.LITTLE else ">"
         results = {}
 
-        for batch in range(1, max(len(registers), 2)):
-            register_batch = {k: v for k, v in registers.items() if (v[7] == batch)}
+        for k, (v, words) in registers.items():
+            if v.decodable:
+                expected = v.vtype(v.unpacker(self.wordorder).unpack(struct.pack(f"{endian}{len(words)}H", *words))[0])
+                results[k] = k in values and values[k] == expected
+            else:
+                results[k] = True
+
+        return results
+
+    def _write_blocks(self, blocks):
+        written = []
 
-            if not register_batch:
+        for address, words, keys in blocks:
+            for k in keys:
+                self._cache_invalidate(k)
+
+            try:
+                result = self._write_holding_register(address, words)
+            except (ConnectionException, ModbusIOException):
+                break
+
+            if result.isError():
+                break
+
+            written += keys
+
+        return written
+
+    def write_many(self, values, verify=False, password=None, rollback=False):
+        # Writes holding registers with as few requests as possible. With a
+        # password, the meter is unlocked through its kppa register first
+        # and locked again afterwards. Returns whether each key was written,
+        # and with verify, read back unchanged.
+        registers = self._encode_many(values)
+        blocks = plan_writes(registers, min(self.max_registers, MAX_WRITE_REGISTERS))
+        readable = [k for k, (v, words) in registers.items() if v.decodable]
+
+        if password is not None and "kppa" not in self.registers:
+            raise KeyError("kppa")
+
+        original = self._read_registers(registerType.HOLDING, readable) if rollback else {}
+
+        if password is not None:
+            self.write("kppa", password)
+
+        try:
+            results = dict.fromkeys(registers, False)
+            results.update(dict.fromkeys(self._write_blocks(blocks), True))
+
+            if verify and all(results.values()):
+                results = self._verify(registers, self._read_registers(registerType.HOLDING, readable))
+
+            # Restore the values read before, as far as they could be read
+            if rollback and not all(results.values()):
+                self._write_blocks(plan_writes(self._encode_many(original, scaling=False), min(self.max_registers, MAX_WRITE_REGISTERS)))
+        finally:
+            if password is not None:
+                self.write("kppa", 0)
+
+        return results
+
+    def plan(self, rtype=registerType.INPUT, keys=None):
+        # Register maps are defined per model, so plans are compiled once per
+        # class and shared by all of its instances. Registers are planned in
+        # address order, so any order of the same keys shares a plan.
+        if keys is not None:
+            keys = frozenset(keys)
+
+        return _decode_plans(self.__class__, rtype, keys, self.wordorder, self.max_gap, self.max_registers)
+
+    def _read_blocks(self, rtype, keys=None):
+        plans = self.plan(rtype, keys)
+        blocks = [None] * len(plans)
+
+        # Errors of the requests that failed, fleets report them
+        self.read_errors = []
+
+        if not self.breaker.allow():
+            self.read_errors.append((errorType.OFFLINE, None))
+            return plans, blocks
+
+        if self.pipeline is not None:
+            return plans, self.pipeline.read([(self, rtype, plan) for plan in plans])
+
+        for i, plan in enumerate(plans):
+            blocks[i] = self._read_block(plan, rtype) or None
+
+            if blocks[i] is None and self.last_error:
+                self.read_errors.append(self.last_error)
+
+            if self.last_error and self.retry.offline(*self.last_error):
+                break
+
+        return plans, blocks
+
+    def _read_registers(self, rtype, keys=None):
+        results = {}
+
+        for plan, registers in zip(*self._read_blocks(rtype, keys)):
+            if registers:
+                results.update(plan.decode(registers))
+
+        return results
+
+    def read_all(self, rtype=registerType.INPUT, scaling=False, keys=None):
+        self.read_errors = []
+
+        if self.cache is None:
+            results = self._read_registers(rtype, keys)
+        else:
+            keys = self._cache_keys(rtype, keys)
+            results, missing = self.cache.lookup(keys)
+
+            if missing:
+                values = self._read_registers(rtype, missing)
+                self.cache.store(values, rtype)
+                results.update(values)
+
+            results = {k: results[k] for k in keys if k in results}
+
+        if scaling:
+            return {k: v * self.get_scaling(k) for k, v in results.items()}
+        else:
+            return {k: v for k, v in results.items()}
+
+    def read_changes(self, rtype=registerType.INPUT, scaling=False, keys=None):
+        if self.delta is None:
+            self.delta = DeltaFilter()
+
+        return self.delta.filter(self.read_all(rtype, scaling, keys), self.registers, rtype, scaling)
+
+    def read_energy(self):
+        if self.energy is None:
+            self.energy = energy.EnergyAccumulator()
+
+        timestamp = time.time()
+        return self.energy.update(self.read_all(registerType.INPUT, True, self.energy.read_keys(self.registers)), self.registers, timestamp)
+
+    def read_raw(self, rtype=registerType.INPUT, keys=None):
+        timestamp = time.time()
+        plans, blocks = self._read_blocks(rtype, keys)
+
+        return snapshot.Snapshot.from_registers(self.__class__, rtype, [(plan.offset, registers) for plan, registers in zip(plans, blocks) if registers], self.wordorder, timestamp)
+
+    def _stream_ticks(self, keys, interval):
+        if keys is None:
+            keys = [k for k, v in self.registers.items() if v.rtype == registerType.INPUT]
+        if not isinstance(keys, dict):
+            keys = {k: interval for k in keys}
+
+        for k in keys:
+            if k not in self.registers:
+                raise KeyError(k)
+
+        # Per key sampling intervals, in whole ticks of the stream interval
+        return {k: max(1, round((v or interval) / interval)) for k, v in keys.items()}
+
+    def _stream_due(self, ticks, due, tick):
+        keys = {}
+
+        for k, n in ticks.items():
+            if due[k] <= tick:
+                keys.setdefault(self.registers[k].rtype, []).append(k)
+                due[k] = tick + n
+
+        return keys
+
+    def _stream_next(self, start, interval, tick):
+        # Schedule against the start time so read latency does not accumulate,
+        # and skip ticks that have already passed.
+        return max(tick + 1, int((time.monotonic() - start) / interval) + 1)
+
+    def stream(self, keys=None, interval=1, scaling=False, count=None):
+        ticks = self._stream_ticks(keys, interval)
+        due = {k: 0 for k in ticks}
+
+        if not ticks:
+            return
+
+        start = time.monotonic()
+        tick = 0
+        samples = 0
+
+        while count is None or samples < count:
+            timestamp = time.time()
+            values = {}
+            keys = self._stream_due(ticks, due, tick)
+
+            for rtype, rkeys in keys.items():
+                values.update(self.read_all(rtype, scaling, rkeys))
+
+            if keys:
+                yield timestamp, values
+                samples += 1
+
+            tick = self._stream_next(start, interval, tick)
+            time.sleep(max(0, start + tick * interval - time.monotonic()))
+
+
+class AsyncMeter(Meter):
+    tcp_client = "pymodbus.client.AsyncModbusTcpClient"
+    udp_client = "pymodbus.client.AsyncModbusUdpClient"
+    serial_client = "pymodbus.client.AsyncModbusSerialClient"
+
+    # Async clients are bound to the event loop they connected on, so they
+    # are pooled per loop and closed as soon as they are released
+    linger = False
+
+    def __init__(self, **kwargs):
+        # Connecting is a coroutine, call connect() or use the meter as an
+        # async context manager before reading.
+        self._setup(**kwargs)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        self.disconnect()
+
+    async def _request(self, function, response, address, length):
+        error = None
+        attempts = 0
+        start = time.monotonic()
+
+        for attempt in range(self.retries):
+            if attempt:
+                await asyncio.sleep(self.retry.delay(attempt))
+
+            if not self.connected():
+                await self.connect()
+
+            if not self.connected():
+                error, code = errorType.DISCONNECTED, None
+                continue
+
+            try:
+                attempts += 1
+                result = await function(address=address, count=length, slave=self.unit)
+                error, code = self._check_response(result, response, length)
+            except ConnectionException:
+                error, code = errorType.DISCONNECTED, None
+            except ModbusIOException:
+                error, code = errorType.TIMEOUT, None
+
+            if error is None:
+                self._record(None)
+                self._observe(function.__name__, address, length, start, attempts)
+                return result.registers
+
+            if not self.retry.retry(error, code):
+                break
+
+        if error is not None:
+            self._record(error, code)
+            self._observe(function.__name__, address, length, start, attempts, error, code)
+
+        return None
+
+    async def _read_input_registers(self, address, length):
+        return await self._request(self.client.read_input_registers, ReadInputRegistersResponse, address, length)
+
+    async def _read_holding_registers(self, address, length):
+        return await self._request(self.client.read_holding_registers, ReadHoldingRegistersResponse, address, length)
+
+    async def _write_holding_register(self, address, value):
+        start = time.monotonic()
+        result = await self.client.write_registers(address=address, values=value, slave=self.unit)
+
+        self._observe("write_registers", address, len(value), start, 1, *self._check_write(result))
+        return result
+
+    async def _read(self, key):
+        rtype = self.registers[key].rtype
+
+        for plan in self.plan(rtype, (key,)):
+            return (await self._read_all(plan, rtype)).get(key)
+
+    async def _read_block(self, plan, rtype):
+        if rtype == registerType.INPUT:
+            return await self._read_input_registers(plan.offset, plan.length)
+        elif rtype == registerType.HOLDING:
+            return await self._read_holding_registers(plan.offset, plan.length)
+        else:
+            raise NotImplementedError(rtype)
+
+    async def _read_all(self, plan, rtype):
+        registers = await self._read_block(plan, rtype)
+
+        if not registers:
+            return {}
+
+        return plan.decode(registers)
+
+    async def _write(self, value, data):
+        if value.rtype == registerType.HOLDING:
+            return await self._write_holding_register(value.address, self._encode(value, data))
+        else:
+            raise NotImplementedError(value.rtype)
+
+    def _pool_key(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        return (self._connection_key, loop)
+
+    async def connect(self):
+        # A client acquired outside of this event loop can't be used in it
+        if self.connection is not None and self.connection.key != self._pool_key():
+            self.disconnect()
+
+        if self.pool and self.connection is None:
+            self._acquire()
+
+        return await self.client.connect()
+
+    def connected(self):
+        if self.pool and self.connection is None:
+            return False
+
+        return self.client.connected
+
+    async def read(self, key, scaling=False):
+        if key not in self.registers:
+            raise KeyError(key)
+
+        if self.cache is not None:
+            return (await self.read_all(self.registers[key].rtype, scaling, (key,))).get(key)
+
+        if not self.breaker.allow():
+            return None
+
+        value = await self._read(key)
+
+        if scaling and value is not None:
+            return value * self.get_scaling(key)
+        else:
+            return value
+
+    async def write(self, key, data):
+        if key not in self.registers:
+            raise KeyError(key)
+
+        self._cache_invalidate(key)
+
+        return await self._write(self.registers[key], data / self.get_scaling(key))
+
+    async def _write_blocks(self, blocks):
+        written = []
+
+        for address, words, keys in blocks:
+            for k in keys:
+                self._cache_invalidate(k)
+
+            try:
+                result = await self._write_holding_register(address, words)
+            except (ConnectionException, ModbusIOException):
+                break
+
+            if result.isError():
+                break
+
+            written += keys
+
+        return written
+
+    async def write_many(self, values, verify=False, password=None, rollback=False):
+        registers = self._encode_many(values)
+        blocks = plan_writes(registers, min(self.max_registers, MAX_WRITE_REGISTERS))
+        readable = [k for k, (v, words) in registers.items() if v.decodable]
+
+        if password is not None and "kppa" not in self.registers:
+            raise KeyError("kppa")
+
+        original = await self._read_registers(registerType.HOLDING, readable) if rollback else {}
+
+        if password is not None:
+            await self.write("kppa", password)
+
+        try:
+            results = dict.fromkeys(registers, False)
+            results.update(dict.fromkeys(await self._write_blocks(blocks), True))
+
+            if verify and all(results.values()):
+                results = self._verify(registers, await self._read_registers(registerType.HOLDING, readable))
+
+            if rollback and not all(results.values()):
+                await self._write_blocks(plan_writes(self._encode_many(original, scaling=False), min(self.max_registers, MAX_WRITE_REGISTERS)))
+        finally:
+            if password is not None:
+                await self.write("kppa", 0)
+
+        return results
+
+    async def _read_blocks(self, rtype, keys=None):
+        plans = self.plan(rtype, keys)
+        blocks = [None] * len(plans)
+
+        # Errors of the requests that failed, fleets report them
+        self.read_errors = []
+
+        if not self.breaker.allow():
+            self.read_errors.append((errorType.OFFLINE, None))
+            return plans, blocks
+
+        if self.pipeline is not None:
+            return plans, await asyncio.get_running_loop().run_in_executor(None, self.pipeline.read, [(self, rtype, plan) for plan in plans])
+
+        for i, plan in enumerate(plans):
+            blocks[i] = await self._read_block(plan, rtype) or None
+
+            if blocks[i] is None and self.last_error:
+                self.read_errors.append(self.last_error)
+
+            if self.last_error and self.retry.offline(*self.last_error):
                 break
 
-            results.update(self._read_all(register_batch, rtype))
+        return plans, blocks
+
+    async def _read_registers(self, rtype, keys=None):
+        results = {}
+
+        for plan, registers in zip(*await self._read_blocks(rtype, keys)):
+            if registers:
+                results.update(plan.decode(registers))
+
+        return results
+
+    async def read_all(self, rtype=registerType.INPUT, scaling=False, keys=None):
+        self.read_errors = []
+
+        if self.cache is None:
+            results = await self._read_registers(rtype, keys)
+        else:
+            keys = self._cache_keys(rtype, keys)
+            results, missing = self.cache.lookup(keys)
+
+            if missing:
+                values = await self._read_registers(rtype, missing)
+                self.cache.store(values, rtype)
+                results.update(values)
+
+            results = {k: results[k] for k in keys if k in results}
 
         if scaling:
             return {k: v * self.get_scaling(k) for k, v in results.items()}
         else:
             return {k: v for k, v in results.items()}
+
+    async def read_changes(self, rtype=registerType.INPUT, scaling=False, keys=None):
+        if self.delta is None:
+            self.delta = DeltaFilter()
+
+        return self.delta.filter(await self.read_all(rtype, scaling, keys), self.registers, rtype, scaling)
+
+    async def read_energy(self):
+        if self.energy is None:
+            self.energy = energy.EnergyAccumulator()
+
+        timestamp = time.time()
+        return self.energy.update(await self.read_all(registerType.INPUT, True, self.energy.read_keys(self.registers)), self.registers, timestamp)
+
+    async def read_raw(self, rtype=registerType.INPUT, keys=None):
+        timestamp = time.time()
+        plans, blocks = await self._read_blocks(rtype, keys)
+
+        return snapshot.Snapshot.from_registers(self.__class__, rtype, [(plan.offset, registers) for plan, registers in zip(plans, blocks) if registers], self.wordorder, timestamp)
+
+    async def stream(self, keys=None, interval=1, scaling=False, count=None):
+        ticks = self._stream_ticks(keys, interval)
+        due = {k: 0 for k in ticks}
+
+        if not ticks:
+            return
+
+        start = time.monotonic()
+        tick = 0
+        samples = 0
+
+        while count is None or samples < count:
+            timestamp = time.time()
+            values = {}
+            keys = self._stream_due(ticks, due, tick)
+
+            for rtype, rkeys in keys.items():
+                values.update(await self.read_all(rtype, scaling, rkeys))
+
+            if keys:
+                yield timestamp, values
+                samples += 1
+
+            tick = self._stream_next(start, interval, tick)
+            await asyncio.sleep(max(0, start + tick * interval - time.monotonic()))
@@ -0,0 +1,263 @@
+import http.server
+import threading
+import time
+
+from sdm_modbus import meter
+from sdm_modbus.retry import errorType
+
+
+# Latency buckets in seconds, upper bounds as in Prometheus histograms
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Framing bytes around a PDU: MBAP header over TCP and UDP, unit and CRC over RTU
+FRAMING = {
+    meter.connectionType.TCP: 7,
+    meter.connectionType.UDP: 7,
+    meter.connectionType.RTU: 3
+}
+
+
+class RequestEvent:
+    __slots__ = ("device", "function", "address", "count", "latency", "attempts", "error", "code", "sent", "received", "timestamp")
+
+    def __init__(self, device, function, address, count, latency, attempts, error=None, code=None, sent=0, received=0):
+        self.device = device
+        self.function = function
+        self.address = address
+        self.count = count
+        self.latency = latency
+        self.attempts = attempts
+        self.error = error
+        self.code = code
+        self.sent = sent
+        self.received = received
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.function}, address={self.address}, count={self.count}, latency={self.latency:.4f}, attempts={self.attempts}, error={self.error}, code={self.code})"
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - 1)
+
+
+class Histogram:
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(count={self.count}, sum={self.sum:.4f})"
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        # Interpolated within the bucket, as histogram_quantile() does
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        lower, below = 0, 0
+
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if bound == float("inf"):
+                    return lower
+
+                return lower + (bound - lower) * (rank - below) / max(1, total - below)
+
+            lower, below = bound, total
+
+        return lower
+
+
+class RequestStats:
+
+    def __init__(self, buckets=BUCKETS):
+        self.requests = 0
+        self.registers = 0
+        self.retries = 0
+        self.sent = 0
+        self.received = 0
+        self.errors = {}
+        self.latency = Histogram(buckets)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(requests={self.requests}, errors={sum(self.errors.values())}, retries={self.retries})"
+
+    def observe(self, event):
+        self.requests += 1
+        self.registers += event.count
+        self.retries += event.retries
+        self.sent += event.sent
+        self.received += event.received
+        self.latency.observe(event.latency)
+
+        if event.error is not None:
+            error = (event.error.name, event.code)
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "registers": self.registers,
+            "retries": self.retries,
+            "errors": sum(self.errors.values()),
+            "bytes_sent": self.sent,
+            "bytes_received": self.received,
+            "latency_mean": self.latency.sum / self.latency.count if self.latency.count else None,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p90": self.latency.quantile(0.9),
+            "latency_p99": self.latency.quantile(0.99)
+        }
+
+
+class Metrics:
+
+    def __init__(self, buckets=BUCKETS, hooks=None):
+        # Request statistics per meter and per connection. Hooks are called
+        # with every RequestEvent, from the thread that made the request.
+        self.buckets = buckets
+        self.hooks = list(hooks or [])
+        self.lock = threading.Lock()
+        self.meters = {}
+        self.connections = {}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(meters={len(self.meters)}, connections={len(self.connections)}, hooks={len(self.hooks)})"
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def endpoint(self, device):
+        return ":".join(str(v.name.lower() if isinstance(v, meter.connectionType) else v) for v in device.endpoint())
+
+    def observe(self, device, function, address, count, latency, attempts, error=None, code=None):
+        # Bytes on the wire follow from the function, count and transport
+        framing = FRAMING.get(device.mode, 0)
+
+        if function.startswith("write"):
+            request, response = 6 + count * 2, 5
+        else:
+            request, response = 5, 2 + count * 2
+
+        if error is errorType.EXCEPTION:
+            received = 2 + framing
+        elif error is not None:
+            received = 0
+        else:
+            received = response + framing
+
+        event = RequestEvent(device, function, address, count, latency, attempts, error, code, attempts * (request + framing), received)
+
+        with self.lock:
+            endpoint = self.endpoint(device)
+            key = (endpoint, device.unit, device.model)
+
+            if key not in self.meters:
+                self.meters[key] = RequestStats(self.buckets)
+            if endpoint not in self.connections:
+                self.connections[endpoint] = RequestStats(self.buckets)
+
+            self.meters[key].observe(event)
+            self.connections[endpoint].observe(event)
+
+        for hook in self.hooks:
+            hook(event)
+
+        return event
+
+    def reset(self):
+        with self.lock:
+            self.meters.clear()
+            self.connections.clear()
+
+    def summary(self):
+        with self.lock:
+            return {
+                "meters": {f"{endpoint}/{unit} {model}": stats.summary() for (endpoint, unit, model), stats in self.meters.items()},
+                "connections": {endpoint: stats.summary() for endpoint, stats in self.connections.items()}
+            }
+
+    def exposition(self, prefix="sdm_modbus"):
+        # Prometheus text format, per meter
+        lines = []
+
+        def metric(name, kind, description):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        with self.lock:
+            meters = [(f'endpoint="{endpoint}",unit="{unit}",model="{model}"', stats) for (endpoint, unit, model), stats in self.meters.items()]
+
+            for name, attribute, description in (
+                ("requests_total", "requests", "Modbus requests"),
+                ("registers_total", "registers", "Registers requested"),
+                ("retries_total", "retries", "Retried Modbus requests"),
+                ("sent_bytes_total", "sent", "Bytes sent, including framing"),
+                ("received_bytes_total", "received", "Bytes received, including framing")
+            ):
+                metric(name, "counter", description)
+                lines += [f"{prefix}_{name}{{{labels}}} {getattr(stats, attribute)}" for labels, stats in meters]
+
+            metric("errors_total", "counter", "Failed Modbus requests by error and exception code")
+
+            for labels, stats in meters:
+                for (error, code), count in stats.errors.items():
+                    lines.append(f'{prefix}_errors_total{{{labels},error="{error}",code="{code or ""}"}} {count}')
+
+            metric("request_duration_seconds", "histogram", "Modbus request latency, including retries")
+
+            for labels, stats in meters:
+                for bound, total in stats.latency.cumulative():
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{"+Inf" if bound == float("inf") else bound}"}} {total}')
+
+                lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {stats.latency.sum}")
+                lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {stats.latency.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9100, host=""):
+        # Exporter in a background thread, stop it with shutdown()
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                body = metrics.exposition().encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="sdm_modbus-metrics", daemon=True).start()
+
+        return server
@@ -0,0 +1,184 @@
+import socket
+import struct
+import threading
+import time
+
+from sdm_modbus.retry import errorType
+
+
+WINDOW = 4
+TIMEOUT = 1
+
+# Read function codes by register type name
+FUNCTIONS = {
+    "HOLDING": 0x03,
+    "INPUT": 0x04
+}
+
+# MBAP header: transaction, protocol, length, unit
+MBAP = struct.Struct(">HHHB")
+READ = struct.Struct(">BHH")
+
+
+class Pipeline:
+
+    def __init__(self, host, port=502, window=WINDOW, timeout=TIMEOUT):
+        # Modbus TCP connection keeping up to window requests in flight,
+        # responses are matched to requests by transaction id. Gateways
+        # which can't queue requests need a window of 1.
+        self.host = host
+        self.port = port
+        self.window = max(1, window)
+        self.timeout = timeout
+        self.lock = threading.RLock()
+        self.sock = None
+        self.buffer = bytearray()
+        self.transaction = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.host}:{self.port}, window={self.window}, timeout={self.timeout})"
+
+    def connect(self):
+        if self.sock is None:
+            self.sock = socket.create_connection((self.host, self.port), self.timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.buffer.clear()
+
+    def close(self):
+        with self.lock:
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+    def _receive(self, deadline):
+        # One response frame, or None once the deadline has passed
+        while True:
+            if len(self.buffer) >= MBAP.size:
+                transaction, protocol, length, unit = MBAP.unpack_from(self.buffer)
+
+                # Frames can't be told apart after a bad header, the
+                # connection is dropped and the pending requests with it
+                if length < 2 or protocol != 0:
+                    raise ConnectionError(f"invalid MBAP header: protocol {protocol}, length {length}")
+
+                if len(self.buffer) >= 6 + length:
+                    pdu = bytes(self.buffer[MBAP.size:6 + length])
+                    del self.buffer[:6 + length]
+                    return transaction, unit, pdu
+
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                return None
+
+            self.sock.settimeout(remaining)
+
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                return None
+
+            if not data:
+                raise ConnectionError("connection closed")
+
+            self.buffer += data
+
+    def execute(self, requests):
+        # Sends read requests of (unit, function, address, count), returns
+        # (registers, error, code) for each, in order
+        results = [(None, errorType.DISCONNECTED, None)] * len(requests)
+
+        with self.lock:
+            try:
+                self.connect()
+            except OSError:
+                return results
+
+            pending = {}
+            sent = 0
+
+            try:
+                while sent < len(requests) or pending:
+                    while sent < len(requests) and len(pending) < self.window:
+                        unit, function, address, count = requests[sent]
+                        self.transaction = (self.transaction + 1) & 0xffff
+
+                        self.sock.sendall(MBAP.pack(self.transaction, 0, 6, unit) + READ.pack(function, address, count))
+                        pending[self.transaction] = (sent, time.monotonic() + self.timeout)
+                        sent += 1
+
+                    response = self._receive(min(deadline for index, deadline in pending.values()))
+
+                    if response is None:
+                        # Late responses would answer transactions that are
+                        # gone, so drop the overdue ones and carry on
+                        now = time.monotonic()
+
+                        for transaction, (index, deadline) in list(pending.items()):
+                            if deadline <= now:
+                                results[index] = (None, errorType.TIMEOUT, None)
+                                del pending[transaction]
+
+                        continue
+
+                    transaction, unit, pdu = response
+
+                    if transaction not in pending:
+                        continue
+
+                    index, deadline = pending.pop(transaction)
+                    results[index] = self._response(requests[index], pdu)
+            except OSError:
+                self.close()
+
+        return results
+
+    def _response(self, request, pdu):
+        unit, function, address, count = request
+
+        if len(pdu) < 2:
+            return None, errorType.SHORT, None
+
+        if pdu[0] == function | 0x80:
+            return None, errorType.EXCEPTION, pdu[1]
+
+        if pdu[0] != function or pdu[1] != count * 2 or len(pdu) < 2 + count * 2:
+            return None, errorType.SHORT, None
+
+        return list(struct.unpack_from(f">{count}H", pdu, 2)), None, None
+
+    def read(self, requests):
+        # Reads (device, register type, plan) requests of any meters on
+        # this connection, retrying failed requests in later windows as the
+        # meters' retry policies allow. Returns registers or None for each.
+        results = [None] * len(requests)
+        attempts = [0] * len(requests)
+        todo = list(range(len(requests)))
+        start = time.monotonic()
+
+        while todo:
+            if attempts[todo[0]]:
+                time.sleep(requests[todo[0]][0].retry.delay(attempts[todo[0]]))
+
+            responses = self.execute([(device.unit, FUNCTIONS[rtype.name], plan.offset, plan.length) for device, rtype, plan in (requests[i] for i in todo)])
+            retry = []
+
+            for i, (registers, error, code) in zip(todo, responses):
+                device, rtype, plan = requests[i]
+                attempts[i] += 1
+
+                if error is None:
+                    results[i] = registers
+                elif attempts[i] < device.retries and device.retry.retry(error, code):
+                    retry.append(i)
+                    continue
+
+                if error is not None:
+                    device.read_errors.append((error, code))
+
+                device._record(error, code)
+                device._observe(f"read_{rtype.name.lower()}_registers", plan.offset, plan.length, start, attempts[i], error, code)
+
+            todo = retry
+
+        return results
@@ -0,0 +1,152 @@
+import threading
+import time
+
+
+MAX_CONNECTIONS = 1
+IDLE_TIMEOUT = 60
+
+
+class BusLock:
+
+    def __init__(self, silence=0):
+        # Serializes the requests on a connection, at least silence seconds
+        # apart, which a Bus sets for its RTU baud rate
+        self.silence = silence
+        self.released = 0
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        # Held across several requests, every request still waits for the
+        # silence after the one before
+        self._lock.acquire()
+
+        wait = self.released + self.silence - time.monotonic()
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return self
+
+    def __exit__(self, *args):
+        self.released = time.monotonic()
+        self._lock.release()
+
+
+class PooledConnection:
+
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.lock = BusLock()
+        self.refs = 0
+        self.released = time.monotonic()
+        self.timer = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.client!r}, refs={self.refs})"
+
+
+class ConnectionPool:
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, idle_timeout=IDLE_TIMEOUT):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.connections = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        connections = sum(len(c) for c in self.connections.values())
+        return f"{self.__class__.__name__}(endpoints={len(self.connections)}, connections={connections}, max_connections={self.max_connections}, idle_timeout={self.idle_timeout})"
+
+    def _close(self, connection):
+        if connection.timer is not None:
+            connection.timer.cancel()
+            connection.timer = None
+
+        connections = self.connections.get(connection.key, [])
+
+        if connection in connections:
+            connections.remove(connection)
+            connection.client.close()
+
+        if not connections:
+            self.connections.pop(connection.key, None)
+
+    def _close_idle(self, timeout):
+        if timeout is None:
+            return
+
+        now = time.monotonic()
+
+        for connections in list(self.connections.values()):
+            for connection in list(connections):
+                if connection.refs == 0 and now - connection.released >= timeout:
+                    self._close(connection)
+
+    def acquire(self, key, factory):
+        with self._lock:
+            self._close_idle(self.idle_timeout)
+
+            connections = self.connections.setdefault(key, [])
+            idle = [c for c in connections if c.refs == 0]
+
+            if idle:
+                connection = idle[0]
+            elif len(connections) < self.max_connections:
+                connection = PooledConnection(key, factory())
+                connections.append(connection)
+            else:
+                connection = min(connections, key=lambda c: c.refs)
+
+            connection.refs += 1
+
+            if connection.timer is not None:
+                connection.timer.cancel()
+                connection.timer = None
+
+            return connection
+
+    def retain(self, connection):
+        with self._lock:
+            connection.refs += 1
+
+    def release(self, connection, linger=True):
+        # Without linger the client is closed as soon as it is unused,
+        # otherwise once it stayed unused for idle_timeout seconds
+        with self._lock:
+            connection.refs -= 1
+
+            if connection.refs == 0:
+                connection.released = time.monotonic()
+
+                if not linger or self.idle_timeout == 0:
+                    self._close(connection)
+                elif self.idle_timeout is not None:
+                    if connection.timer is not None:
+                        connection.timer.cancel()
+
+                    connection.timer = threading.Timer(self.idle_timeout, self._expire, (connection,))
+                    connection.timer.daemon = True
+                    connection.timer.start()
+
+            self._close_idle(self.idle_timeout)
+
+    def _expire(self, connection):
+        with self._lock:
+            # A timer replaced by a later release must not close the client
+            if connection.refs == 0 and connection.timer is threading.current_thread():
+                connection.timer = None
+                self._close(connection)
+
+    def close_idle(self, timeout=0):
+        with self._lock:
+            self._close_idle(timeout)
+
+    def close(self):
+        with self._lock:
+            for connections in list(self.connections.values()):
+                for connection in list(connections):
+                    self._close(connection)
+
+
+DEFAULT_POOL = ConnectionPool()
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+
+from sdm_modbus import meter
+from sdm_modbus import carlogavazzi
+from sdm_modbus import espp1
+from sdm_modbus import garo
+from sdm_modbus import sdm
+from sdm_modbus import taiyedq
+
+
+DETECT_CACHE = os.path.join("~", ".cache", "sdm_modbus", "detect.json")
+
+# Models are probed in this order, so a model has to come before any model
+# whose probes it also answers.
+MODELS = {
+    model.__name__: model for model in (
+        taiyedq.TAC4300_CT,
+        espp1.ESPP1,
+        carlogavazzi.EM24,
+        garo.GNM3D,
+        sdm.SDM630,
+        sdm.SDM120,
+        sdm.SDM72V2,
+        sdm.SDM72,
+        sdm.SDM230
+    )
+}
+
+
+class DetectCache:
+
+    def __init__(self, path=DETECT_CACHE):
+        self.path = os.path.expanduser(path)
+        self.lock = threading.Lock()
+        self.models = {}
+
+        try:
+            with open(self.path) as f:
+                self.models = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path!r}, models={len(self.models)})"
+
+    def key(self, device, unit):
+        return ":".join(str(v.name.lower() if isinstance(v, meter.connectionType) else v) for v in device.endpoint()) + f"/{unit}"
+
+    def get(self, device, unit):
+        return MODELS.get(self.models.get(self.key(device, unit)))
+
+    def set(self, device, unit, model):
+        with self.lock:
+            self.models[self.key(device, unit)] = model.__name__
+            self.save()
+
+    def invalidate(self, device=None, unit=None):
+        with self.lock:
+            if device is None:
+                self.models.clear()
+            else:
+                self.models.pop(self.key(device, unit), None)
+
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Write a temporary file first so readers never see a partial cache
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump(self.models, f, indent=4, sort_keys=True)
+
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+def probe(model, device, reads):
+    # Reads are shared between models, most of them probe the same few
+    # addresses, and each is only requested once per detection.
+    for key, limits in model.probes.items():
+        register = model.registers[key]
+        address = (register.rtype, register.address, register.length)
+
+        if address not in reads:
+            if register.rtype == meter.registerType.INPUT:
+                reads[address] = device._read_input_registers(register.address, register.length)
+            else:
+                reads[address] = device._read_holding_registers(register.address, register.length)
+
+            if reads[address] is None and device.retry.offline(*device.last_error):
+                raise ConnectionError(device.last_error)
+
+        if reads[address] is None:
+            return False
+
+        if limits is None:
+            continue
+
+        value = meter.DecodePlan(register.address, register.length, {key: register}, model.wordorder).decode(reads[address]).get(key)
+
+        if value is None or not (limits[0] <= value * register.sf <= limits[1]):
+            return False
+
+    return True
+
+
+def detect(device, unit=None, cache=None, models=None):
+    unit = unit or device.unit
+
+    if cache is not None:
+        model = cache.get(device, unit)
+
+        if model is not None:
+            return model
+
+    prober = meter.Meter(parent=device, unit=unit)
+    reads = {}
+
+    try:
+        for model in (models or MODELS.values()):
+            if probe(model, prober, reads):
+                break
+        else:
+            model = None
+    except ConnectionError:
+        model = None
+    finally:
+        prober.disconnect()
+
+    if cache is not None and model is not None:
+        cache.set(device, unit, model)
+
+    return model
@@ -0,0 +1,107 @@
+import enum
+import random
+
+
+BACKOFF = 0.1
+BACKOFF_FACTOR = 2
+BACKOFF_MAX = 2
+JITTER = 0.2
+
+BREAKER_THRESHOLD = 3
+BREAKER_CYCLES = 10
+
+
+class errorType(enum.Enum):
+    EXCEPTION = 1
+    TIMEOUT = 2
+    SHORT = 3
+    DISCONNECTED = 4
+
+    # Not requested, the circuit breaker has the meter offline
+    OFFLINE = 5
+
+
+class exceptionCode(enum.IntEnum):
+    ILLEGAL_FUNCTION = 0x01
+    ILLEGAL_ADDRESS = 0x02
+    ILLEGAL_VALUE = 0x03
+    DEVICE_FAILURE = 0x04
+    ACKNOWLEDGE = 0x05
+    DEVICE_BUSY = 0x06
+    GATEWAY_PATH_UNAVAILABLE = 0x0a
+    GATEWAY_NO_RESPONSE = 0x0b
+
+
+class RetryPolicy:
+    # Exception codes worth retrying, the device is busy but alive
+    retry_codes = (exceptionCode.ACKNOWLEDGE, exceptionCode.DEVICE_BUSY)
+
+    # Exception codes meaning the device behind a gateway did not answer
+    offline_codes = (exceptionCode.GATEWAY_PATH_UNAVAILABLE, exceptionCode.GATEWAY_NO_RESPONSE)
+
+    def __init__(self, retries=3, backoff=BACKOFF, factor=BACKOFF_FACTOR, max_backoff=BACKOFF_MAX, jitter=JITTER, threshold=BREAKER_THRESHOLD, cycles=BREAKER_CYCLES):
+        self.retries = retries
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.threshold = threshold
+        self.cycles = cycles
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(retries={self.retries}, backoff={self.backoff}, factor={self.factor}, max_backoff={self.max_backoff}, jitter={self.jitter}, threshold={self.threshold}, cycles={self.cycles})"
+
+    def delay(self, attempt):
+        delay = min(self.max_backoff, self.backoff * self.factor ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def retry(self, error, code=None):
+        if error is errorType.EXCEPTION:
+            return code in self.retry_codes or code in self.offline_codes
+
+        return True
+
+    def offline(self, error, code=None):
+        if error is errorType.EXCEPTION:
+            return code in self.offline_codes
+
+        return error in (errorType.TIMEOUT, errorType.DISCONNECTED)
+
+    def breaker(self):
+        return CircuitBreaker(self.threshold, self.cycles)
+
+
+class CircuitBreaker:
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cycles=BREAKER_CYCLES):
+        self.threshold = threshold
+        self.cycles = cycles
+        self.failures = 0
+        self.skipped = 0
+        self.offline = False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(offline={self.offline}, failures={self.failures}, skipped={self.skipped})"
+
+    def allow(self):
+        if not self.offline:
+            return True
+
+        # Skip the configured number of cycles, then let one probe through
+        if self.skipped < self.cycles:
+            self.skipped += 1
+            return False
+
+        return True
+
+    def success(self):
+        self.failures = 0
+        self.skipped = 0
+        self.offline = False
+
+    def failure(self):
+        self.failures += 1
+
+        if self.threshold and self.failures >= self.threshold:
+            self.offline = True
+            self.skipped = 0
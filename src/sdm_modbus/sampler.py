@@ -0,0 +1,182 @@
+import array
+import math
+import threading
+import time
+
+
+# Aggregation windows in seconds, samples kept per register, and slots per
+# window, which sets how finely a window rolls
+WINDOWS = (1, 10, 60)
+SAMPLES = 1024
+SLOTS = 10
+
+# Seconds between samples while the meter answers none of the reads
+IDLE = 1
+
+
+class SampleRing:
+
+    def __init__(self, size=SAMPLES):
+        # The latest samples of one register, oldest overwritten first
+        self.size = size
+        self.times = array.array("d", bytes(8 * size))
+        self.values = array.array("d", bytes(8 * size))
+        self.count = 0
+        self.position = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(size={self.size}, count={self.count})"
+
+    def append(self, timestamp, value):
+        self.times[self.position] = timestamp
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def last(self):
+        if not self.count:
+            return None
+
+        return self.times[self.position - 1], self.values[self.position - 1]
+
+    def samples(self, since=None):
+        # Oldest first, optionally only those taken after since
+        start = (self.position - self.count) % self.size
+        order = [(start + i) % self.size for i in range(self.count)]
+
+        return [(self.times[i], self.values[i]) for i in order if since is None or self.times[i] > since]
+
+
+class RollingWindow:
+
+    def __init__(self, window, slots=SLOTS):
+        # Aggregates of the last window seconds, kept per slot of
+        # window / slots seconds so old samples expire a slot at a time
+        self.window = window
+        self.slots = slots
+        self.width = window / slots
+        self.epochs = array.array("q", [-1] * slots)
+        self.mins = array.array("d", bytes(8 * slots))
+        self.maxs = array.array("d", bytes(8 * slots))
+        self.sums = array.array("d", bytes(8 * slots))
+        self.counts = array.array("q", bytes(8 * slots))
+        self.last = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(window={self.window}, slots={self.slots})"
+
+    def add(self, timestamp, value):
+        self.last = value
+
+        # NaN is kept as the last value, but would poison min, max and mean
+        if value != value:
+            return
+
+        epoch = int(timestamp // self.width)
+        i = epoch % self.slots
+
+        if self.epochs[i] != epoch:
+            self.epochs[i] = epoch
+            self.mins[i] = self.maxs[i] = self.sums[i] = value
+            self.counts[i] = 1
+        else:
+            self.mins[i] = min(self.mins[i], value)
+            self.maxs[i] = max(self.maxs[i], value)
+            self.sums[i] += value
+            self.counts[i] += 1
+
+    def aggregate(self, now=None):
+        epoch = int((time.time() if now is None else now) // self.width)
+        slots = [i for i in range(self.slots) if epoch - self.slots < self.epochs[i] <= epoch]
+        count = sum(self.counts[i] for i in slots)
+
+        if not count:
+            return None
+
+        return {
+            "min": min(self.mins[i] for i in slots),
+            "max": max(self.maxs[i] for i in slots),
+            "mean": math.fsum(self.sums[i] for i in slots) / count,
+            "last": self.last,
+            "count": count
+        }
+
+
+class Sampler:
+
+    def __init__(self, device, keys, windows=WINDOWS, size=SAMPLES, scaling=True, slots=SLOTS):
+        # Samples a few registers of a meter as fast as the bus allows, in
+        # as few requests as possible. Memory is fixed by size and slots.
+        self.device = device
+        self.scaling = scaling
+        self.keys = {}
+
+        for k in keys:
+            if k not in device.registers:
+                raise KeyError(k)
+
+            self.keys.setdefault(device.registers[k].rtype, []).append(k)
+
+        self.rings = {k: SampleRing(size) for k in keys}
+        self.windows = {k: {w: RollingWindow(w, slots) for w in windows} for k in keys}
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.device!r}, keys={len(self.rings)}, windows={list(next(iter(self.windows.values()), {}))}, count={self.count})"
+
+    def sample(self):
+        timestamp = time.time()
+        values = {}
+
+        for rtype, keys in self.keys.items():
+            values.update(self.device.read_all(rtype, self.scaling, keys))
+
+        with self.lock:
+            for k, v in values.items():
+                self.rings[k].append(timestamp, v)
+
+                for window in self.windows[k].values():
+                    window.add(timestamp, v)
+
+            self.count += 1
+
+        return values
+
+    def run(self, interval=0, stop=None, count=None, idle=IDLE):
+        # Samples back to back by default, or every interval seconds. A meter
+        # that is offline answers at once, so empty samples wait idle seconds.
+        if stop is None:
+            stop = threading.Event()
+
+        start = time.monotonic()
+        samples = 0
+
+        while not stop.is_set() and (count is None or samples < count):
+            values = self.sample()
+            samples += 1
+
+            if not values:
+                stop.wait(max(idle, interval))
+                start = time.monotonic() - samples * interval
+            elif interval:
+                stop.wait(max(0, start + samples * interval - time.monotonic()))
+
+    def last(self, key):
+        with self.lock:
+            return self.rings[key].last()
+
+    def samples(self, key, since=None):
+        with self.lock:
+            return self.rings[key].samples(since)
+
+    def aggregate(self, key, window, now=None):
+        with self.lock:
+            return self.windows[key][window].aggregate(now)
+
+    def aggregates(self, window=None, now=None):
+        with self.lock:
+            if window is None:
+                return {k: {w: v.aggregate(now) for w, v in windows.items()} for k, windows in self.windows.items()}
+
+            return {k: windows[window].aggregate(now) for k, windows in self.windows.items()}
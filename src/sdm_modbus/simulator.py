@@ -0,0 +1,455 @@
+import argparse
+import asyncio
+import importlib
+import os
+import random
+import struct
+import threading
+import time
+
+from sdm_modbus import meter
+from sdm_modbus.retry import exceptionCode
+
+
+UPDATE_INTERVAL = 1
+
+# Nominal values per unit string, values drift around them
+NOMINAL = {
+    "V": 230,
+    "A": 5,
+    "W": 1150,
+    "VA": 1200,
+    "VAr": 150,
+    "Hz": 50,
+    "%": 2,
+    "°": 10,
+    "s": 60,
+    "min": 60,
+    "ms": 100,
+    "h": 1000
+}
+
+# Counters only ever increase, by about a kilowatt's worth per hour
+COUNTERS = ("kWh", "kVArh", "Kvarh", "kVAh", "Wh", "m3", "GJ")
+
+LIMITS = {
+    meter.registerDataType.UINT16: (0, 0xffff),
+    meter.registerDataType.UINT32: (0, 0xffffffff),
+    meter.registerDataType.UINT64: (0, 0xffffffffffffffff),
+    meter.registerDataType.INT16: (-0x8000, 0x7fff),
+    meter.registerDataType.INT32: (-0x80000000, 0x7fffffff),
+    meter.registerDataType.INT64: (-0x8000000000000000, 0x7fffffffffffffff)
+}
+
+
+def crc16(data):
+    crc = 0xffff
+
+    for byte in data:
+        crc ^= byte
+
+        for i in range(8):
+            crc = (crc >> 1) ^ 0xa001 if crc & 1 else crc >> 1
+
+    return struct.pack("<H", crc)
+
+
+class SimulatedMeter:
+
+    def __init__(self, model, seed=None):
+        self.model = model
+        self.random = random.Random(seed)
+        self.words = {rtype: {} for rtype in meter.registerType}
+        self.values = {}
+        self.updated = time.monotonic()
+
+        # Requests have to start and end on a register, gaps in between read
+        # as zero like on most meters.
+        self.starts = {rtype: set() for rtype in meter.registerType}
+        self.ends = {rtype: set() for rtype in meter.registerType}
+
+        for k, v in model.registers.items():
+            self.starts[v.rtype].add(v.address)
+            self.ends[v.rtype].add(v.end)
+            self.values[k] = self.nominal(k, v)
+
+        self.encode()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.model.__name__})"
+
+    def nominal(self, key, register):
+        if isinstance(register.fmt, list):
+            return min(1, len(register.fmt) - 1)
+        if register.fmt in COUNTERS:
+            return self.random.uniform(1000, 10000)
+        if register.fmt == "V" and any(p in key for p in ("l12", "l23", "l31", "ll")):
+            return NOMINAL["V"] * 3 ** 0.5
+        if register.fmt == "" and "factor" in key:
+            return 0.95
+        if key == "serial_number":
+            return self.random.randrange(10000000, 99999999)
+
+        return NOMINAL.get(register.fmt, 0)
+
+    def update(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed, self.updated = now - self.updated, now
+
+        for k, v in self.model.registers.items():
+            if v.rtype != meter.registerType.INPUT or isinstance(v.fmt, list):
+                continue
+
+            if v.fmt in COUNTERS:
+                self.values[k] += elapsed / 3600 * self.random.uniform(0.5, 1.5)
+            elif v.fmt == "Hz":
+                self.values[k] = NOMINAL["Hz"] * self.random.uniform(0.998, 1.002)
+            elif v.fmt in NOMINAL:
+                self.values[k] = self.nominal(k, v) * self.random.uniform(0.95, 1.05)
+
+        self.encode()
+
+    def encode(self):
+        for k, v in self.model.registers.items():
+            words = self.words[v.rtype]
+
+            if not v.decodable:
+                for address in range(v.address, v.end):
+                    words[address] = 0
+                continue
+
+            value = self.values[k] / v.sf
+
+            if v.dtype in LIMITS:
+                low, high = LIMITS[v.dtype]
+                value = max(low, min(high, int(round(value))))
+
+            # The inverse of DecodePlan, pack in word order and split in words
+            endian = "<" if self.model.wordorder == meter.Endian.LITTLE else ">"
+            data = struct.pack(endian + v.code, value)
+
+            for i, word in enumerate(struct.unpack(f"{endian}{v.length}H", data)):
+                words[v.address + i] = word
+
+    def read(self, rtype, address, count):
+        if address not in self.starts[rtype] or address + count not in self.ends[rtype]:
+            return None
+
+        if time.monotonic() - self.updated >= UPDATE_INTERVAL:
+            self.update()
+
+        words = self.words[rtype]
+        return [words.get(a, 0) for a in range(address, address + count)]
+
+    def write(self, address, values):
+        rtype = meter.registerType.HOLDING
+
+        if address not in self.starts[rtype] or address + len(values) not in self.ends[rtype]:
+            return False
+
+        for i, word in enumerate(values):
+            self.words[rtype][address + i] = word
+
+        # Keep written values, so they read back after the next update
+        for k, v in self.model.registers.items():
+            if v.rtype == rtype and v.decodable and address <= v.address and v.end <= address + len(values):
+                endian = "<" if self.model.wordorder == meter.Endian.LITTLE else ">"
+                data = struct.pack(f"{endian}{v.length}H", *[self.words[rtype][a] for a in range(v.address, v.end)])
+                self.values[k] = struct.unpack(endian + v.code, data)[0] * v.sf
+
+        return True
+
+
+class Simulator:
+
+    def __init__(self, meters=None, latency=0, jitter=0, drop=0, seed=None):
+        # Meters by unit, latency and jitter in seconds, drop as the share
+        # of requests left unanswered.
+        self.meters = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.drop = drop
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.dropped = 0
+
+        self.loop = None
+        self.thread = None
+        self.servers = []
+        self.device = None
+        self._pty = None
+
+        for unit, model in (meters or {}).items():
+            self.add(unit, model)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(meters={len(self.meters)}, latency={self.latency}, jitter={self.jitter}, drop={self.drop})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def add(self, unit, model):
+        self.meters[unit] = SimulatedMeter(model, seed=self.random.random())
+        return self.meters[unit]
+
+    def remove(self, unit):
+        self.meters.pop(unit, None)
+
+    def delay(self):
+        if self.latency or self.jitter:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+        return 0
+
+    def dropped_request(self):
+        self.requests += 1
+
+        if self.drop and self.random.random() < self.drop:
+            self.dropped += 1
+            return True
+
+        return False
+
+    def handle(self, unit, pdu):
+        # Returns the response PDU, or None when nothing answers
+        device = self.meters.get(unit)
+
+        if device is None:
+            return None
+
+        function = pdu[0]
+
+        try:
+            if function in (0x03, 0x04):
+                address, count = struct.unpack_from(">HH", pdu, 1)
+                rtype = meter.registerType.HOLDING if function == 0x03 else meter.registerType.INPUT
+                words = device.read(rtype, address, count)
+
+                if words is None:
+                    return bytes((function | 0x80, exceptionCode.ILLEGAL_ADDRESS))
+
+                return struct.pack(f">BB{count}H", function, count * 2, *words)
+            elif function == 0x06:
+                address, value = struct.unpack_from(">HH", pdu, 1)
+                values = [value]
+            elif function == 0x10:
+                address, count = struct.unpack_from(">HH", pdu, 1)
+                values = list(struct.unpack_from(f">{count}H", pdu, 6))
+            else:
+                return bytes((function | 0x80, exceptionCode.ILLEGAL_FUNCTION))
+        except struct.error:
+            return bytes((function | 0x80, exceptionCode.ILLEGAL_VALUE))
+
+        if not device.write(address, values):
+            return bytes((function | 0x80, exceptionCode.ILLEGAL_ADDRESS))
+
+        return pdu[:5]
+
+    def handle_gateway(self, unit, pdu):
+        # Like a gateway, answer for units that aren't there
+        if self.dropped_request():
+            return None
+
+        response = self.handle(unit, pdu)
+
+        if response is None:
+            return bytes((pdu[0] | 0x80, exceptionCode.GATEWAY_NO_RESPONSE))
+
+        return response
+
+    async def _tcp_connection(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction, protocol, length, unit = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                response = self.handle_gateway(unit, pdu)
+
+                if response is None:
+                    continue
+
+                # Answered after the delay without holding up the next
+                # request, like a gateway queueing pipelined requests
+                frame = struct.pack(">HHHB", transaction, protocol, len(response) + 1, unit) + response
+                self.loop.call_later(self.delay(), self._tcp_send, writer, frame)
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _tcp_send(self, writer, frame):
+        if not writer.is_closing():
+            writer.write(frame)
+
+    def _udp_protocol(self):
+        simulator = self
+
+        class Protocol(asyncio.DatagramProtocol):
+
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def datagram_received(self, data, address):
+                if len(data) < 8:
+                    return
+
+                transaction, protocol, length, unit = struct.unpack_from(">HHHB", data)
+                response = simulator.handle_gateway(unit, data[7:6 + length])
+
+                if response is None:
+                    return
+
+                frame = struct.pack(">HHHB", transaction, protocol, len(response) + 1, unit) + response
+                simulator.loop.call_later(simulator.delay(), self.transport.sendto, frame, address)
+
+        return Protocol()
+
+    def _rtu_frame(self, buffer):
+        # RTU frames carry no length, derive it from the function code
+        if len(buffer) < 2:
+            return 0
+        if buffer[1] in (0x03, 0x04, 0x06):
+            return 8
+        if buffer[1] == 0x10:
+            return 9 + buffer[6] if len(buffer) >= 7 else 0
+
+        return len(buffer)
+
+    def _rtu_readable(self, fd, buffer):
+        try:
+            buffer += os.read(fd, 256)
+        except OSError:
+            return
+
+        while buffer:
+            length = self._rtu_frame(buffer)
+
+            if not length or len(buffer) < length:
+                return
+
+            frame, buffer[:] = bytes(buffer[:length]), buffer[length:]
+
+            if crc16(frame[:-2]) != frame[-2:]:
+                buffer.clear()
+                return
+
+            # Serial meters that aren't there stay silent
+            if self.dropped_request():
+                continue
+
+            response = self.handle(frame[0], frame[1:-2])
+
+            if response is not None:
+                response = bytes((frame[0],)) + response
+                self.loop.call_later(self.delay(), os.write, fd, response + crc16(response))
+
+    async def _serve(self, tcp, udp, rtu, host, started):
+        if tcp is not None:
+            self.servers.append(await asyncio.start_server(self._tcp_connection, host, tcp))
+
+        if udp is not None:
+            transport, protocol = await self.loop.create_datagram_endpoint(self._udp_protocol, local_addr=(host, udp))
+            self.servers.append(transport)
+
+        if rtu:
+            import tty
+
+            master, slave = os.openpty()
+            tty.setraw(slave)
+            self._pty = (master, slave)
+            self.device = os.ttyname(slave)
+            self.loop.add_reader(master, self._rtu_readable, master, bytearray())
+
+        started.set()
+
+    def start(self, tcp=None, udp=None, rtu=False, host="127.0.0.1"):
+        # Serves in a background thread, a pty stands in for the serial bus
+        # and its device path is left in self.device.
+        started = threading.Event()
+        self.loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self._serve(tcp, udp, rtu, host, started))
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, name="sdm_modbus-simulator", daemon=True)
+        self.thread.start()
+        started.wait()
+
+        return self
+
+    async def _close(self):
+        for server in self.servers:
+            server.close()
+
+        if self._pty:
+            self.loop.remove_reader(self._pty[0])
+
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.stop()
+
+    def stop(self):
+        if self.loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self._close(), self.loop)
+        self.thread.join()
+
+        if self._pty:
+            for fd in self._pty:
+                os.close(fd)
+
+        self.loop.close()
+        self.loop = None
+        self.servers = []
+        self.device = None
+        self._pty = None
+
+
+def parse_units(spec):
+    # SDM630:1-100,SDM120:101
+    package = importlib.import_module("sdm_modbus")
+    meters = {}
+
+    for part in spec.split(","):
+        name, units = part.split(":")
+        model = getattr(package, name)
+        first, _, last = units.partition("-")
+
+        for unit in range(int(first), int(last or first) + 1):
+            meters[unit] = model
+
+    return meters
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("units", type=str, help="Models and units, e.g. SDM630:1-100,SDM120:101-200")
+    argparser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    argparser.add_argument("--tcp", type=int, default=None, help="Modbus TCP port")
+    argparser.add_argument("--udp", type=int, default=None, help="Modbus UDP port")
+    argparser.add_argument("--rtu", action="store_true", default=False, help="Serve Modbus RTU on a pseudo-terminal")
+    argparser.add_argument("--latency", type=float, default=0, help="Response latency in seconds")
+    argparser.add_argument("--jitter", type=float, default=0, help="Random additional latency in seconds")
+    argparser.add_argument("--drop", type=float, default=0, help="Share of requests left unanswered")
+    argparser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = argparser.parse_args()
+
+    simulator = Simulator(parse_units(args.units), args.latency, args.jitter, args.drop, args.seed)
+    simulator.start(args.tcp, args.udp, args.rtu, args.host)
+
+    print(f"{simulator}: tcp={args.tcp}, udp={args.udp}, rtu={simulator.device}")
+
+    try:
+        simulator.thread.join()
+    except KeyboardInterrupt:
+        simulator.stop()
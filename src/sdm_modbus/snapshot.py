@@ -0,0 +1,136 @@
+import importlib
+import struct
+import time
+
+from pymodbus.constants import Endian
+
+from sdm_modbus import meter
+
+
+MAGIC = b"SDMS"
+VERSION = 1
+
+# magic, version, register type, word order, timestamp, model name length, spans
+HEADER = struct.Struct(">4sBBcdBH")
+SPAN = struct.Struct(">HH")
+
+
+class Snapshot:
+
+    def __init__(self, model, rtype, spans, data, wordorder=None, timestamp=None):
+        # Raw register words of one or more blocks, packed in the meter's
+        # word order so every value unpacks straight from the buffer.
+        self.model = model
+        self.rtype = rtype
+        self.spans = list(spans)
+        self.data = memoryview(data)
+        self.wordorder = wordorder or model.wordorder
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._index = None
+
+    @classmethod
+    def from_registers(cls, model, rtype, blocks, wordorder=None, timestamp=None):
+        endian = "<" if (wordorder or model.wordorder) == Endian.LITTLE else ">"
+        spans = []
+        data = bytearray()
+
+        for offset, registers in blocks:
+            spans.append((offset, len(registers)))
+            data += struct.pack(f"{endian}{len(registers)}H", *registers)
+
+        return cls(model, rtype, spans, bytes(data), wordorder, timestamp)
+
+    @classmethod
+    def from_bytes(cls, frame, model=None):
+        frame = memoryview(frame)
+        magic, version, rtype, wordorder, timestamp, length, count = HEADER.unpack_from(frame)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} snapshot")
+
+        position = HEADER.size
+        name = bytes(frame[position:position + length]).decode()
+        position += length
+
+        if model is None:
+            model = getattr(importlib.import_module("sdm_modbus"), name, None)
+
+            if not (isinstance(model, type) and issubclass(model, meter.Meter)):
+                raise ValueError(f"unknown model {name}")
+
+        spans = [SPAN.unpack_from(frame, position + i * SPAN.size) for i in range(count)]
+        position += count * SPAN.size
+
+        return cls(model, meter.registerType(rtype), spans, frame[position:], Endian(wordorder.decode()), timestamp)
+
+    def to_bytes(self):
+        name = self.model.__name__.encode()
+        header = HEADER.pack(MAGIC, VERSION, self.rtype.value, self.wordorder.value.encode(), self.timestamp, len(name), len(self.spans))
+
+        return b"".join([
+            header,
+            name,
+            *[SPAN.pack(offset, length) for offset, length in self.spans],
+            self.data
+        ])
+
+    def __reduce__(self):
+        return (self.__class__.from_bytes, (self.to_bytes(),))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.model.__name__}, {self.rtype}, registers={len(self.data) // 2}, keys={len(self.index())})"
+
+    def index(self):
+        # Byte positions of the keys whose registers were read, built on
+        # first access
+        if self._index is None:
+            self._index = {}
+            position = 0
+
+            for offset, length in self.spans:
+                for k, v in self.model.registers.items():
+                    if v.rtype == self.rtype and v.decodable and offset <= v.address and v.end <= offset + length:
+                        self._index.setdefault(k, position + (v.address - offset) * 2)
+
+                position += length * 2
+
+        return self._index
+
+    def keys(self):
+        return list(self.index())
+
+    def __contains__(self, key):
+        return key in self.index()
+
+    def __iter__(self):
+        return iter(self.index())
+
+    def __getitem__(self, key):
+        position = self.index()[key]
+        register = self.model.registers[key]
+
+        return register.vtype(register.unpacker(self.wordorder).unpack_from(self.data, position)[0])
+
+    def __getattr__(self, key):
+        if key.startswith("_"):
+            raise AttributeError(key)
+
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def get(self, key, default=None):
+        if key in self.index():
+            return self[key]
+
+        return default
+
+    def decode(self, keys=None, scaling=False):
+        if keys is None:
+            keys = self.index()
+
+        if scaling:
+            return {k: self[k] * self.model.registers[k].sf for k in keys if k in self.index()}
+        else:
+            return {k: self[k] for k in keys if k in self.index()}
@@ -0,0 +1,434 @@
+import bisect
+import hashlib
+import importlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from sdm_modbus import meter
+
+
+SEGMENT_ROWS = 65536
+
+MAGIC = b"SDMT"
+VERSION = 1
+
+# magic, version, rows, first and last log generation, first and last timestamp
+SEGMENT = struct.Struct("<4sBxxxQIIdd")
+
+
+def meter_name(device):
+    return ":".join(str(v.name.lower() if isinstance(v, meter.connectionType) else v) for v in device.endpoint()) + f"/{device.unit}"
+
+
+def _align(position):
+    return (position + 7) & ~7
+
+
+def series_schema(model, rtype=meter.registerType.INPUT):
+    # The register map fixes the schema, a changed map starts a new series
+    keys = [k for k, v in model.registers.items() if v.rtype == rtype and v.decodable]
+    schema = {"model": model.__name__, "rtype": rtype.name, "keys": keys, "codes": [model.registers[k].code for k in keys]}
+    digest = hashlib.sha1(json.dumps(schema).encode()).hexdigest()[:8]
+
+    return f"{model.__name__}-{rtype.name.lower()}-{digest}", schema
+
+
+class Series:
+
+    def __init__(self, path, model, rtype=meter.registerType.INPUT, segment_rows=SEGMENT_ROWS):
+        # Samples of one model and register type. New rows are appended to a
+        # log of fixed size records, which compaction turns into segments of
+        # one column per register, sorted by time and read memory-mapped.
+        name, schema = series_schema(model, rtype)
+
+        self.model = model
+        self.rtype = rtype
+        self.segment_rows = segment_rows
+        self.keys = schema["keys"]
+        self.codes = schema["codes"]
+        self.bitmap = (len(self.keys) + 7) // 8
+        self.record = struct.Struct(f"<dI{self.bitmap}s" + "".join(self.codes))
+        self.types = [float if code in "efd" else int for code in self.codes]
+        self.path = os.path.join(path, name)
+        self.segments = []
+        self.log = None
+        self.rows = 0
+
+        os.makedirs(self.path, exist_ok=True)
+
+        with open(os.path.join(self.path, "schema.json"), "w") as f:
+            json.dump(schema, f, indent=4)
+
+        self._open()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.model.__name__}, {self.rtype}, segments={len(self.segments)}, log={self.rows})"
+
+    def _open(self):
+        for name in sorted(os.listdir(self.path)):
+            if name.startswith("seg-") and name.endswith(".bin"):
+                self.segments.append(Segment(os.path.join(self.path, name), self))
+            elif name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
+
+        # Segments left behind by an interrupted merge are covered by another
+        covered = [s for s in self.segments if any(o is not s and o.first <= s.first and s.last <= o.last for o in self.segments)]
+
+        for segment in covered:
+            segment.close()
+            os.remove(segment.path)
+
+        self.segments = sorted((s for s in self.segments if s not in covered), key=lambda s: s.first)
+        compacted = max((s.last for s in self.segments), default=0)
+
+        # Logs already compacted into a segment are left by an interrupted
+        # compaction, a partial record by an interrupted append
+        logs = []
+
+        for name in os.listdir(self.path):
+            if name.startswith("log-") and name.endswith(".bin"):
+                generation = int(name[4:-4])
+
+                if generation <= compacted:
+                    os.remove(os.path.join(self.path, name))
+                else:
+                    logs.append(generation)
+
+        self.generation = max(logs, default=compacted + 1)
+        self.log = open(self._log_path(self.generation), "ab", buffering=0)
+
+        size = self.log.seek(0, os.SEEK_END)
+        self.log.truncate(size - size % self.record.size)
+        self.rows = size // self.record.size
+
+        # Older logs were never compacted, their rows are merged in first
+        for generation in sorted(logs):
+            if generation != self.generation:
+                self._compact_log(generation)
+
+    def _log_path(self, generation):
+        return os.path.join(self.path, f"log-{generation:08d}.bin")
+
+    def append(self, meter_id, values, timestamp, scaling=False):
+        present = 0
+        row = []
+
+        # Values are stored as read, as the register's data type, scaled
+        # values are turned back into what was read first
+        for i, (k, vtype) in enumerate(zip(self.keys, self.types)):
+            if k in values:
+                value = values[k] / self.model.registers[k].sf if scaling else values[k]
+                present |= 1 << i
+                row.append(round(value) if vtype is int else float(value))
+            else:
+                row.append(0)
+
+        self.log.write(self.record.pack(timestamp, meter_id, present.to_bytes(self.bitmap, "little"), *row))
+        self.rows += 1
+
+        if self.rows >= self.segment_rows:
+            self.compact()
+
+    def _log_rows(self, generation):
+        with open(self._log_path(generation), "rb") as f:
+            data = f.read()
+
+        return [self.record.unpack_from(data, i) for i in range(0, len(data) - len(data) % self.record.size, self.record.size)]
+
+    def _compact_log(self, generation):
+        rows = self._log_rows(generation)
+
+        if rows:
+            self.segments.append(Segment.write(os.path.join(self.path, f"seg-{generation:08d}.bin"), self, sorted(rows, key=lambda r: r[0]), generation, generation))
+
+        os.remove(self._log_path(generation))
+
+    def compact(self):
+        # Turn the log into a segment, then merge runs of small segments
+        self.log.close()
+        self._compact_log(self.generation)
+
+        self.generation += 1
+        self.log = open(self._log_path(self.generation), "ab", buffering=0)
+        self.rows = 0
+
+        merged = []
+        run = []
+
+        for segment in self.segments + [None]:
+            if segment is not None and sum(s.rows for s in run) + segment.rows <= self.segment_rows:
+                run.append(segment)
+                continue
+
+            if len(run) > 1:
+                rows = sorted((row for s in run for row in s.rows_between()), key=lambda r: r[0])
+                path = os.path.join(self.path, f"seg-{run[-1].last:08d}.bin")
+
+                for s in run:
+                    s.close()
+
+                # Replaces the newest segment of the run, the older ones are
+                # covered by it should removing them be interrupted
+                merged.append(Segment.write(path, self, rows, run[0].first, run[-1].last))
+
+                for s in run[:-1]:
+                    os.remove(s.path)
+            else:
+                merged += run
+
+            run = [segment] if segment is not None else []
+
+        self.segments = merged
+
+    def query(self, start=None, end=None):
+        # Rows with start <= timestamp < end, segments first, then the log
+        for segment in self.segments:
+            if (start is None or segment.end >= start) and (end is None or segment.start < end):
+                yield from segment.rows_between(start, end)
+
+        if self.rows:
+            for row in self._log_rows(self.generation):
+                if (start is None or row[0] >= start) and (end is None or row[0] < end):
+                    yield row
+
+    def drop(self, before):
+        # Removes the segments holding only rows older than before
+        kept = []
+
+        for segment in self.segments:
+            if segment.end < before:
+                segment.close()
+                os.remove(segment.path)
+            else:
+                kept.append(segment)
+
+        self.segments = kept
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+        if self.log is not None:
+            self.log.close()
+
+
+class Segment:
+
+    def __init__(self, path, series):
+        self.path = path
+        self.series = series
+
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.rows, self.first, self.last, self.start, self.end = SEGMENT.unpack_from(self.mmap)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} segment")
+
+        # Columns are little endian, cast in place on little endian hosts
+        self.views = [memoryview(self.mmap)]
+        position = _align(SEGMENT.size)
+        self.columns = []
+
+        for code, size in [("d", 8), ("I", 4), ("B", series.bitmap)] + [(code, struct.calcsize(code)) for code in series.codes]:
+            column = self.views[0][position:position + self.rows * size]
+            self.views.append(column)
+
+            if code == "B":
+                self.columns.append(column)
+            elif sys.byteorder == "little":
+                self.columns.append(column.cast(code))
+                self.views.append(self.columns[-1])
+            else:
+                self.columns.append(struct.unpack(f"<{self.rows}{code}", column))
+
+            position = _align(position + self.rows * size)
+
+        self.timestamps = self.columns[0]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({os.path.basename(self.path)}, rows={self.rows}, start={self.start}, end={self.end})"
+
+    @classmethod
+    def write(cls, path, series, rows, first, last):
+        columns = [
+            struct.pack(f"<{len(rows)}d", *[r[0] for r in rows]),
+            struct.pack(f"<{len(rows)}I", *[r[1] for r in rows]),
+            b"".join(r[2] for r in rows)
+        ]
+
+        for i, code in enumerate(series.codes):
+            columns.append(struct.pack(f"<{len(rows)}{code}", *[r[3 + i] for r in rows]))
+
+        data = bytearray(SEGMENT.pack(MAGIC, VERSION, len(rows), first, last, rows[0][0], rows[-1][0]))
+
+        for column in columns:
+            data += bytes(_align(len(data)) - len(data))
+            data += column
+
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(f"{path}.tmp", path)
+        return cls(path, series)
+
+    def rows_between(self, start=None, end=None):
+        lower = 0 if start is None else bisect.bisect_left(self.timestamps, start)
+        upper = self.rows if end is None else bisect.bisect_left(self.timestamps, end)
+        bitmap = self.series.bitmap
+
+        for i in range(lower, upper):
+            yield (self.timestamps[i], self.columns[1][i], bytes(self.columns[2][i * bitmap:(i + 1) * bitmap])) + tuple(c[i] for c in self.columns[3:])
+
+    def close(self):
+        self.columns = []
+        self.timestamps = None
+
+        # The map can only be closed once no view of it is left
+        for view in reversed(self.views):
+            view.release()
+
+        self.mmap.close()
+
+
+class TimeSeriesStore:
+
+    def __init__(self, path, segment_rows=SEGMENT_ROWS):
+        # One series per model and register type under path, and the names
+        # of the meters that were stored
+        self.path = os.path.expanduser(path)
+        self.segment_rows = segment_rows
+        self.lock = threading.RLock()
+        self.series = {}
+        self.meters = []
+
+        os.makedirs(self.path, exist_ok=True)
+
+        try:
+            with open(os.path.join(self.path, "meters.json")) as f:
+                self.meters = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        self.meter_ids = {name: i for i, name in enumerate(self.meters)}
+
+        # Series stored before, as long as their model's register map is
+        # unchanged
+        package = importlib.import_module("sdm_modbus")
+
+        for name in sorted(os.listdir(self.path)):
+            try:
+                with open(os.path.join(self.path, name, "schema.json")) as f:
+                    schema = json.load(f)
+
+                model = getattr(package, schema["model"])
+                rtype = meter.registerType[schema["rtype"]]
+            except (OSError, ValueError, KeyError, AttributeError):
+                continue
+
+            if series_schema(model, rtype)[0] == name:
+                self.get_series(model, rtype)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path!r}, series={len(self.series)}, meters={len(self.meters)})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_series(self, model, rtype=meter.registerType.INPUT):
+        if isinstance(model, str):
+            model = getattr(importlib.import_module("sdm_modbus"), model)
+
+        with self.lock:
+            if (model, rtype) not in self.series:
+                self.series[(model, rtype)] = Series(self.path, model, rtype, self.segment_rows)
+
+            return self.series[(model, rtype)]
+
+    def meter_id(self, name):
+        with self.lock:
+            if name not in self.meter_ids:
+                self.meter_ids[name] = len(self.meters)
+                self.meters.append(name)
+
+                with open(os.path.join(self.path, "meters.json.tmp"), "w") as f:
+                    json.dump(self.meters, f, indent=4)
+
+                os.replace(os.path.join(self.path, "meters.json.tmp"), os.path.join(self.path, "meters.json"))
+
+            return self.meter_ids[name]
+
+    def append(self, device, values, timestamp=None, rtype=meter.registerType.INPUT, name=None, scaling=False):
+        # Values as returned by read_all(), stored as read. Pass scaling if
+        # they were read with scaling, query() scales them again on request.
+        series = self.get_series(type(device), rtype)
+
+        with self.lock:
+            series.append(self.meter_id(name or meter_name(device)), values, time.time() if timestamp is None else timestamp, scaling)
+
+    def append_results(self, results, rtype=meter.registerType.INPUT, scaling=False):
+        # Results of fleet.poll(), partial polls are kept and polls without
+        # any values skipped
+        for device, result in results.items():
+            if result.values:
+                self.append(device, result.values, result.timestamp, rtype, scaling=scaling)
+
+    def query(self, model, start=None, end=None, keys=None, device=None, scaling=False, rtype=meter.registerType.INPUT):
+        # Yields (timestamp, meter name, values) for start <= timestamp < end,
+        # of one meter if device is given, as an instance or a name
+        series = self.get_series(model, rtype)
+        meter_id = None if device is None else self.meter_ids.get(device if isinstance(device, str) else meter_name(device), -1)
+        columns = [(i, k, series.model.registers[k].vtype, series.model.registers[k].sf if scaling else 1) for i, k in enumerate(series.keys) if keys is None or k in keys]
+
+        with self.lock:
+            rows = list(series.query(start, end))
+
+        for row in rows:
+            if meter_id is not None and row[1] != meter_id:
+                continue
+
+            present = int.from_bytes(row[2], "little")
+            yield row[0], self.meters[row[1]], {k: vtype(row[3 + i]) * sf for i, k, vtype, sf in columns if present >> i & 1}
+
+    def columns(self, model, start=None, end=None, keys=None, device=None, scaling=False, rtype=meter.registerType.INPUT):
+        # The same rows as query(), as a list per key, None where not read
+        series = self.get_series(model, rtype)
+        keys = [k for k in series.keys if keys is None or k in keys]
+        results = {"timestamp": [], "meter": [], **{k: [] for k in keys}}
+
+        for timestamp, name, values in self.query(model, start, end, keys, device, scaling, rtype):
+            results["timestamp"].append(timestamp)
+            results["meter"].append(name)
+
+            for k in keys:
+                results[k].append(values.get(k))
+
+        return results
+
+    def compact(self):
+        with self.lock:
+            for series in self.series.values():
+                series.compact()
+
+    def drop(self, before):
+        with self.lock:
+            for series in self.series.values():
+                series.drop(before)
+
+    def close(self):
+        with self.lock:
+            for series in self.series.values():
+                series.close()
+
+            self.series.clear()
@@ -0,0 +1,15 @@
+import pytest
+
+import sdm_modbus
+
+
+@pytest.fixture
+def simulator():
+    # Simulated Modbus TCP gateway on a free port with an SDM630 on unit 1
+    simulator = sdm_modbus.Simulator({1: sdm_modbus.SDM630})
+    simulator.start(tcp=0)
+    simulator.port = simulator.servers[0].sockets[0].getsockname()[1]
+
+    yield simulator
+
+    simulator.stop()
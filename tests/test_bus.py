@@ -0,0 +1,81 @@
+import threading
+import time
+
+import sdm_modbus
+
+
+def test_silence_between_requests():
+    lock = sdm_modbus.BusLock(silence=0.05)
+
+    with lock:
+        with lock:
+            pass
+
+        start = time.monotonic()
+
+        with lock:
+            assert time.monotonic() - start >= 0.04
+
+
+def test_snapshot_holds_the_bus(simulator):
+    simulator.latency = 0.01
+
+    for unit in (2, 3, 4):
+        simulator.add(unit, sdm_modbus.SDM630)
+
+    bus = sdm_modbus.Bus(host="127.0.0.1", port=simulator.port, pool=False)
+
+    for unit in (1, 2, 3):
+        bus.add(sdm_modbus.SDM630, unit=unit)
+
+    # Shares the bus, but isn't part of the snapshot
+    other = bus.add(sdm_modbus.SDM630, unit=4)
+    bus.remove(other)
+
+    stop = threading.Event()
+    reads = []
+
+    def poll():
+        while not stop.is_set():
+            other.read_all(keys=["frequency"])
+            reads.append(time.time())
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+
+    try:
+        time.sleep(0.05)
+        snapshot = bus.snapshot(["total_power_active"], scaling=True, rest=["frequency"])
+        time.sleep(0.05)
+    finally:
+        stop.set()
+        thread.join()
+
+    first, last = min(snapshot.timestamps.values()), max(snapshot.timestamps.values())
+
+    assert len(snapshot.values) == 3
+    assert all(v == {"total_power_active": 1150.0} for v in snapshot.values.values())
+    assert all(v == {"frequency": 50.0} for v in snapshot.rest.values())
+    assert snapshot.skew == last - first
+    assert reads
+    # No other request was answered in the middle of the synchronized pass
+    assert not any(first < end < last for end in reads)
+
+    bus.parent.disconnect()
+
+
+def test_bus_on_a_shared_connection(simulator):
+    pool = sdm_modbus.ConnectionPool()
+    earlier = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+    bus = sdm_modbus.Bus(host="127.0.0.1", port=simulator.port, pool=pool, silence=0.05)
+
+    # Meters created before the bus keep to its silence too
+    assert earlier.lock is bus.lock
+
+    earlier.read("frequency")
+    start = time.monotonic()
+    earlier.read("frequency")
+
+    assert time.monotonic() - start >= 0.04
+
+    pool.close()
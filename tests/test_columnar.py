@@ -0,0 +1,35 @@
+import pytest
+from pymodbus.constants import Endian
+
+import sdm_modbus
+from sdm_modbus import columnar
+
+pytest.importorskip("numpy")
+
+
+def test_columnar_plans_follow_decode_plans(simulator):
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False)
+    plans = columnar.columnar_plans(device, keys=["frequency", "l1_voltage"])
+
+    assert plans is columnar.columnar_plans(device, keys=["l1_voltage", "frequency"])
+    assert [p.plan for p in plans] == device.plan(keys=["frequency", "l1_voltage"])
+    assert columnar._columnar_plans.cache_info().maxsize == sdm_modbus.PLAN_CACHE
+
+
+def test_read_columns_word_orders(simulator):
+    for unit in (2, 3):
+        simulator.add(unit, sdm_modbus.SDM630)
+
+    fleet = sdm_modbus.MeterFleet.from_config([{"model": "SDM630", "host": "127.0.0.1", "port": simulator.port, "unit": unit} for unit in (1, 2, 3)])
+    fleet.meters[1].wordorder = Endian.LITTLE
+
+    results = fleet.read_columns(keys=["frequency"])
+    devices, columns = results[sdm_modbus.SDM630]
+
+    assert list(results) == [sdm_modbus.SDM630]
+    assert devices == fleet.meters
+    assert len(columns["frequency"]) == 3
+    assert columns["frequency"][0] == columns["frequency"][2] == 50.0
+    assert columns["frequency"][1] != 50.0
+
+    fleet.disconnect()
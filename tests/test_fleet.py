@@ -0,0 +1,52 @@
+import sdm_modbus
+from sdm_modbus.retry import errorType
+
+
+def fleet(simulator, **kwargs):
+    simulator.add(2, sdm_modbus.SDM630)
+    policy = sdm_modbus.RetryPolicy(retries=1, threshold=1, cycles=10)
+    config = [{"model": "SDM630", "host": "127.0.0.1", "port": simulator.port, "unit": unit, "retry": policy, "pool": False, **kwargs} for unit in (1, 2)]
+
+    return sdm_modbus.MeterFleet.from_config(config)
+
+
+def fail_first_block(device):
+    # The meter answers every request but the first of a poll
+    read_block = device._read_block
+    plans = device.plan()
+
+    def failing(plan, rtype):
+        if plan is plans[0]:
+            device._record(errorType.EXCEPTION, 4)
+            return None
+
+        return read_block(plan, rtype)
+
+    device._read_block = failing
+
+
+def test_errors_of_earlier_blocks(simulator):
+    with fleet(simulator) as meters:
+        fail_first_block(meters.meters[0])
+        results = meters.poll()
+        first, second = (results[device] for device in meters.meters)
+
+        assert not first.ok
+        assert (first.error, first.code) == (errorType.EXCEPTION, 4)
+        assert first.values and len(first.values) < len(second.values)
+        assert second.ok
+
+        meters.disconnect()
+
+
+def test_offline_meters(simulator):
+    for kwargs in ({}, {"pipeline": 4}):
+        with fleet(simulator, **kwargs) as meters:
+            meters.meters[0].breaker.failure()
+            results = meters.poll()
+            first, second = (results[device] for device in meters.meters)
+
+            assert (first.error, first.values) == (errorType.OFFLINE, {})
+            assert second.ok and second.values
+
+            meters.disconnect()
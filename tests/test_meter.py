@@ -0,0 +1,53 @@
+import pytest
+from pymodbus.constants import Endian
+
+import sdm_modbus
+from sdm_modbus import meter
+
+
+def test_plans_shared_across_key_orders(simulator):
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False)
+    plans = device.plan(keys=["frequency", "l1_voltage"])
+
+    assert plans is device.plan(keys=("l1_voltage", "frequency"))
+    assert plans is sdm_modbus.SDM630(parent=device, unit=2).plan(keys=["l1_voltage", "frequency"])
+    assert device.read_all(keys=["frequency", "l1_voltage"]) == device.read_all(keys=["l1_voltage", "frequency"])
+
+    device.disconnect()
+
+
+def test_plan_cache_is_bounded(simulator):
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False)
+    keys = [k for k, v in device.registers.items() if v.rtype == sdm_modbus.registerType.INPUT]
+
+    for i in range(sdm_modbus.PLAN_CACHE + 10):
+        device.plan(keys=keys[i % len(keys):i % len(keys) + 1 + i // len(keys)])
+
+    assert meter._decode_plans.cache_info().currsize <= sdm_modbus.PLAN_CACHE
+
+    device.disconnect()
+
+
+def test_encode_word_orders(simulator):
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False)
+    register = device.registers["demand_period"]
+
+    assert device._encode(register, 60) == device.client.convert_to_registers(60.0, device.client.DATATYPE.FLOAT32, "big")
+
+    device.wordorder = Endian.LITTLE
+    assert device._encode(register, 60) == device.client.convert_to_registers(60.0, device.client.DATATYPE.FLOAT32, "little")
+
+    with pytest.raises(NotImplementedError):
+        device._endian_enum_to_string("middle")
+
+    device.disconnect()
+
+
+def test_write_integer_registers(simulator):
+    simulator.add(2, sdm_modbus.TAC4300_CT)
+    device = sdm_modbus.TAC4300_CT(host="127.0.0.1", port=simulator.port, unit=2, pool=False)
+
+    assert device.write_many({"baud": 2}, verify=True, password=1) == {"baud": True}
+    assert device.read("baud") == 2
+
+    device.disconnect()
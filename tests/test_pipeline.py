@@ -0,0 +1,66 @@
+import socket
+import struct
+import threading
+
+import sdm_modbus
+from sdm_modbus.retry import errorType
+
+
+def gateway(responses):
+    # Answers the first request of each connection with the next of
+    # responses, a function of the request's transaction id
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        for response in responses:
+            connection, address = server.accept()
+
+            with connection:
+                transaction = struct.unpack(">H", connection.recv(12)[:2])[0]
+                connection.sendall(response(transaction))
+                connection.recv(12)
+
+        server.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def test_matches_out_of_order_responses(simulator):
+    simulator.jitter = 0.02
+
+    for unit in range(2, 9):
+        simulator.add(unit, sdm_modbus.SDM630)
+
+    pipeline = sdm_modbus.Pipeline("127.0.0.1", simulator.port, window=8)
+    results = pipeline.execute([(unit, 0x04, 70, 2) for unit in range(1, 9)] + [(20, 0x04, 70, 2)])
+
+    assert all(error is None and registers == results[0][0] for registers, error, code in results[:8])
+    assert results[8][1:] == (errorType.EXCEPTION, 0x0b)
+
+    pipeline.close()
+
+
+def test_meter_reads_through_pipeline(simulator):
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pipeline=4, pool=False)
+    plain = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False)
+
+    assert device.read_all() == plain.read_all()
+
+    device.disconnect()
+    plain.disconnect()
+
+
+def test_short_frames_drop_the_connection():
+    port = gateway([
+        lambda transaction: struct.pack(">HHHB", transaction, 0, 1, 1),
+        lambda transaction: struct.pack(">HHHB", transaction, 0, 0, 1) + struct.pack(">HHHBBBH", transaction, 0, 5, 1, 4, 2, 7),
+        lambda transaction: struct.pack(">HHHBB", transaction, 0, 2, 1, 4)
+    ])
+
+    pipeline = sdm_modbus.Pipeline("127.0.0.1", port, timeout=1)
+
+    for error in (errorType.DISCONNECTED, errorType.DISCONNECTED, errorType.SHORT):
+        assert pipeline.execute([(1, 0x04, 0, 1)]) == [(None, error, None)]
+
+    pipeline.close()
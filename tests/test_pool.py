@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import sdm_modbus
+
+
+def test_shared_client(simulator):
+    pool = sdm_modbus.ConnectionPool()
+    a = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+    b = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+
+    assert a.client is b.client
+    assert a.connection.refs == 2
+
+    a.disconnect()
+    b.disconnect()
+    pool.close()
+
+
+def test_timeout_gets_own_client(simulator):
+    pool = sdm_modbus.ConnectionPool()
+    a = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+    b = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool, timeout=7)
+
+    assert a.client is not b.client
+    assert b.client.comm_params.timeout_connect == 7
+
+    pool.close()
+
+
+def test_closed_after_idle_timeout(simulator):
+    pool = sdm_modbus.ConnectionPool(idle_timeout=0.2)
+    a = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+    b = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+    client = a.client
+
+    assert a.read_all()
+
+    a.disconnect()
+    time.sleep(0.4)
+    assert client.is_socket_open()
+
+    b.disconnect()
+    assert client.is_socket_open()
+
+    time.sleep(0.4)
+    assert not client.is_socket_open()
+    assert not pool.connections
+
+
+def test_disconnect_is_idempotent(simulator):
+    pool = sdm_modbus.ConnectionPool()
+    a = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+    b = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=pool)
+
+    assert b.read_all()
+
+    a.disconnect()
+    a.disconnect()
+
+    assert not a.connected()
+    assert b.connected()
+
+    # Reading again acquires a client from the pool
+    assert a.read_all()
+    assert a.connection.refs == 2
+
+    pool.close()
+
+
+def test_async_clients_per_event_loop(simulator):
+    async def read():
+        device = sdm_modbus.AsyncSDM630(host="127.0.0.1", port=simulator.port)
+        await device.connect()
+
+        return await device.read_all()
+
+    assert asyncio.run(read())
+    assert asyncio.run(read())
@@ -0,0 +1,30 @@
+import time
+
+import sdm_modbus
+
+
+def test_samples(simulator):
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False)
+    sampler = sdm_modbus.Sampler(device, ["frequency", "l1_voltage"], windows=(10,), size=4)
+    sampler.run(count=6)
+
+    assert len(sampler.samples("frequency")) == 4
+    assert sampler.aggregate("frequency", 10)["count"] == 6
+    assert sampler.last("l1_voltage")[1] == 230.0
+
+    device.disconnect()
+
+
+def test_offline_meter_does_not_spin(simulator):
+    policy = sdm_modbus.RetryPolicy(retries=1, threshold=1, cycles=100)
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False, retry=policy)
+    device.breaker.failure()
+
+    sampler = sdm_modbus.Sampler(device, ["frequency"])
+    start = time.monotonic()
+    sampler.run(count=3, idle=0.1)
+
+    assert time.monotonic() - start >= 0.3
+    assert sampler.last("frequency") is None
+
+    device.disconnect()
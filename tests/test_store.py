@@ -0,0 +1,41 @@
+import sdm_modbus
+
+
+def test_round_trip(simulator, tmp_path):
+    device = sdm_modbus.SDM630(host="127.0.0.1", port=simulator.port, pool=False)
+    values = device.read_all()
+
+    with sdm_modbus.TimeSeriesStore(tmp_path, segment_rows=4) as store:
+        for i in range(10):
+            store.append(device, values, timestamp=1000 + i)
+
+    # Reopened, most rows come from compacted segments
+    with sdm_modbus.TimeSeriesStore(tmp_path, segment_rows=4) as store:
+        rows = list(store.query("SDM630"))
+
+        assert [timestamp for timestamp, name, v in rows] == [1000 + i for i in range(10)]
+        assert all(v == values for timestamp, name, v in rows)
+        assert rows[0][1] == sdm_modbus.meter_name(device)
+
+        rows = list(store.query("SDM630", start=1003, end=1005, keys=["frequency"], scaling=True))
+        assert [(timestamp, v) for timestamp, name, v in rows] == [(1003, {"frequency": 50.0}), (1004, {"frequency": 50.0})]
+
+    device.disconnect()
+
+
+def test_scaled_values(simulator, tmp_path):
+    simulator.add(2, sdm_modbus.EM24)
+    device = sdm_modbus.EM24(host="127.0.0.1", port=simulator.port, unit=2, pool=False)
+    scaled = device.read_all(scaling=True)
+    integers = [k for k, v in device.registers.items() if v.rtype == sdm_modbus.registerType.INPUT and v.sf != 1 and v.code in "hHiIqQ"]
+
+    assert integers
+
+    with sdm_modbus.TimeSeriesStore(tmp_path) as store:
+        store.append(device, scaled, timestamp=1000, scaling=True)
+        timestamp, name, values = next(store.query("EM24", scaling=True))
+
+    for k in integers:
+        assert abs(values[k] - scaled[k]) <= abs(device.registers[k].sf) / 2
+
+    device.disconnect()